@@ -0,0 +1,211 @@
+# embedding_cache.py
+"""
+Content-addressed cache of sentence embeddings.
+
+Entries are keyed by (model id, SHA-256 of the whitespace-normalized text),
+where the model id also names the backend and whether vectors are normalized,
+so vectors from different encoders never mix. Lookups go to an in-process
+LRU first, then to an on-disk SQLite table shared by every worker on the
+host; only texts missing from both are encoded, in one batch, and written
+back to both tiers. Skill strings such as "python" and frequently seen job
+descriptions are therefore encoded once per host, not once per request.
+
+The disk tier is bounded too: rows carry an accessed_at timestamp (refreshed
+at most hourly on a hit) and, every EMBEDDING_CACHE_TRIM_EVERY writes, rows
+beyond EMBEDDING_CACHE_MAX_ROWS are dropped least recently used first.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))  # LRU entries
+# SQLite file for the disk tier; set to "" to keep the cache in memory only
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3")
+EMBEDDING_CACHE_MAX_ROWS = int(os.getenv("EMBEDDING_CACHE_MAX_ROWS", "100000"))  # disk tier cap; 0 = unbounded
+EMBEDDING_CACHE_TRIM_EVERY = int(os.getenv("EMBEDDING_CACHE_TRIM_EVERY", "1000"))  # disk writes between trims
+_TOUCH_INTERVAL = 3600  # seconds; coarser accessed_at updates keep hits mostly read-only
+
+
+def normalize_text(text):
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def text_key(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    def __init__(self, max_size=EMBEDDING_CACHE_SIZE, path=EMBEDDING_CACHE_PATH, max_rows=EMBEDDING_CACHE_MAX_ROWS):
+        self.max_size = max_size
+        self.path = path
+        self.max_rows = max_rows
+        self._writes_since_trim = 0
+        self._entries = OrderedDict()  # (model id, sha256) -> float32 vector
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # ── Disk tier ────────────────────────────────────────────────────────────
+    def _conn(self):
+        if self._db is None and self.path:
+            db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")  # concurrent readers across workers
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL, hash BLOB NOT NULL, vec BLOB NOT NULL,"
+                " accessed_at INTEGER NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (model, hash)) WITHOUT ROWID"
+            )
+            columns = {row[1] for row in db.execute("PRAGMA table_info(embeddings)")}
+            if "accessed_at" not in columns:  # file written before the disk tier was capped
+                db.execute("ALTER TABLE embeddings ADD COLUMN accessed_at INTEGER NOT NULL DEFAULT 0")
+            db.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed_at ON embeddings (accessed_at)")
+            db.commit()
+            self._db = db
+            self._trim()
+        return self._db
+
+    def _disk_get(self, model_id, hashes):
+        found = {}
+        with self._db_lock:
+            db = self._conn()
+            if db is None:
+                return found
+            for start in range(0, len(hashes), 500):  # SQLite bound-parameter limit
+                chunk = hashes[start:start + 500]
+                rows = db.execute(
+                    f"SELECT hash, vec FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(chunk))})",
+                    [model_id, *chunk],
+                )
+                for h, vec in rows:
+                    found[h] = np.frombuffer(vec, dtype=np.float32)
+            if found:
+                now = int(time.time())
+                try:
+                    db.executemany(
+                        "UPDATE embeddings SET accessed_at = ? WHERE model = ? AND hash = ? AND accessed_at < ?",
+                        [(now, model_id, h, now - _TOUCH_INTERVAL) for h in found],
+                    )
+                    db.commit()
+                except sqlite3.Error as e:
+                    print("Embedding cache touch failed:", e)
+        return found
+
+    def _disk_put(self, model_id, items):
+        with self._db_lock:
+            db = self._conn()
+            if db is None:
+                return
+            now = int(time.time())
+            rows = [(model_id, h, np.asarray(vec, dtype=np.float32).tobytes(), now) for h, vec in items]
+            try:
+                db.executemany(
+                    "INSERT OR IGNORE INTO embeddings (model, hash, vec, accessed_at) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                print("Embedding cache write failed:", e)
+                return
+            self._writes_since_trim += len(rows)
+            if self._writes_since_trim >= EMBEDDING_CACHE_TRIM_EVERY:
+                self._trim()
+
+    def _trim(self):
+        """Drop least recently used rows beyond max_rows. Caller holds _db_lock."""
+        self._writes_since_trim = 0
+        if not self.max_rows:
+            return
+        try:
+            excess = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_rows
+            if excess > 0:
+                self._db.execute(
+                    "DELETE FROM embeddings WHERE (model, hash) IN"
+                    " (SELECT model, hash FROM embeddings ORDER BY accessed_at LIMIT ?)",
+                    (excess,),
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            print("Embedding cache trim failed:", e)
+
+    # ── Memory tier ──────────────────────────────────────────────────────────
+    def _remember(self, model_id, h, vec):
+        with self._lock:
+            self._entries[(model_id, h)] = vec
+            self._entries.move_to_end((model_id, h))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def encode(self, model_id, encoder, texts, batch_size=32, normalize_embeddings=True):
+        """
+        Embeddings of `texts` as a float32 (n, dim) array, in order. `encoder`
+        is called (with no arguments) only when something must be encoded.
+        """
+        texts = list(texts)
+        hashes = [text_key(t) for t in texts]
+        vectors = {}
+
+        with self._lock:
+            for h in hashes:
+                vec = self._entries.get((model_id, h))
+                if vec is not None:
+                    self._entries.move_to_end((model_id, h))
+                    vectors[h] = vec
+        self.hits += len(vectors)
+
+        missing = [h for h in dict.fromkeys(hashes) if h not in vectors]
+        if missing:
+            from_disk = self._disk_get(model_id, missing)
+            self.disk_hits += len(from_disk)
+            for h, vec in from_disk.items():
+                vectors[h] = vec
+                self._remember(model_id, h, vec)
+
+        todo = {}  # hash -> text, one encode per distinct text
+        for h, text in zip(hashes, texts):
+            if h not in vectors:
+                todo.setdefault(h, normalize_text(text))
+        if todo:
+            self.misses += len(todo)
+            encoded = np.asarray(
+                encoder().encode(list(todo.values()), batch_size=batch_size, normalize_embeddings=normalize_embeddings),
+                dtype=np.float32,
+            )
+            for h, vec in zip(todo, encoded):
+                vectors[h] = vec
+                self._remember(model_id, h, vec)
+            self._disk_put(model_id, zip(todo, encoded))
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([vectors[h] for h in hashes])
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "disk": self.path or None,
+        }
+
+
+embedding_cache = EmbeddingCache()
+
+
+def cached_encode(model_name, encoder, texts, batch_size=32, normalize_embeddings=True):
+    """Encode through the shared cache; the model id includes backend and normalization."""
+    from embedding_backend import EMBEDDING_BACKEND
+
+    model_id = f"{model_name}|{EMBEDDING_BACKEND}|{'norm' if normalize_embeddings else 'raw'}"
+    return embedding_cache.encode(model_id, encoder, texts, batch_size, normalize_embeddings)
@@ -0,0 +1,148 @@
+# jobs/browser_pool.py
+"""
+Bounded pool of warm Chrome sessions shared by the Selenium scrapers.
+
+Starting undetected_chromedriver costs seconds per search, so browsers are
+created lazily up to BROWSER_POOL_SIZE and handed out per request with
+checkout(). A session is health-checked before each checkout and recycled
+after BROWSER_MAX_PAGES page loads to cap memory growth. Images, fonts and
+stylesheets are blocked since the scrapers only read the HTML.
+"""
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+import undetected_chromedriver as uc
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "50"))
+BROWSER_CHECKOUT_TIMEOUT = float(os.getenv("BROWSER_CHECKOUT_TIMEOUT", "180"))
+# Set SCRAPER_HEADLESS=0 to get a visible window for solving a CAPTCHA by hand;
+# headless, the CAPTCHA fallback gives up after SCRAPER_HEADLESS_WAIT seconds
+HEADLESS = os.getenv("SCRAPER_HEADLESS", "1") != "0"
+BLOCK_RESOURCES = os.getenv("SCRAPER_BLOCK_RESOURCES", "1") != "0"
+
+_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.css",
+]
+
+
+def new_driver():
+    options = uc.ChromeOptions()
+    if HEADLESS:
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1200,1000")
+    if BLOCK_RESOURCES:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.fonts": 2,
+        })
+
+    driver = uc.Chrome(options=options)
+    if BLOCK_RESOURCES:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _BLOCKED_URLS})
+    return driver
+
+
+class PooledBrowser:
+    """A pooled driver plus the number of pages it has loaded."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+    def get(self, url):
+        self.pages += 1
+        self.driver.get(url)
+
+    def is_healthy(self):
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    def __init__(self, size=BROWSER_POOL_SIZE, max_pages=BROWSER_MAX_PAGES, factory=new_driver):
+        self.size = size
+        self.max_pages = max_pages
+        self._factory = factory
+        self._idle = queue.LifoQueue()  # most recently used first: warmest session
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._recycled = 0
+
+    @contextmanager
+    def checkout(self, timeout=BROWSER_CHECKOUT_TIMEOUT):
+        """Borrow a healthy browser for one request; waits when all are busy."""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No browser available in the scraper pool")
+        browser = None
+        try:
+            browser = self._take()
+            yield browser
+        except Exception:
+            # A browser that raised mid-request may be wedged; don't reuse it
+            if browser is not None:
+                self._discard(browser)
+                browser = None
+            raise
+        finally:
+            if browser is not None:
+                self._return(browser)
+            self._slots.release()
+
+    def _take(self):
+        while True:
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    self._created += 1
+                return PooledBrowser(self._factory())
+            if browser.is_healthy():
+                return browser
+            self._discard(browser)
+
+    def _return(self, browser):
+        if browser.pages >= self.max_pages:
+            self._discard(browser)
+        else:
+            self._idle.put(browser)
+
+    def _discard(self, browser):
+        browser.quit()
+        with self._lock:
+            self._recycled += 1
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().quit()
+            except queue.Empty:
+                return
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "created": self._created,
+            "recycled": self._recycled,
+        }
+
+
+browser_pool = BrowserPool()
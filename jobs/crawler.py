@@ -0,0 +1,226 @@
+# jobs/crawler.py
+"""
+Background crawl scheduler.
+
+The crawl_frontier table holds one row per (source, query, results page) with
+its next due time. Every CRAWL_TICK_SECONDS the scheduler claims the due rows,
+fetches their listing pages over its own HTTP scraper (each source with its
+own concurrency budget and minimum gap between requests, separate from the
+limiter user searches go through), and fetches detail pages only for links
+we do not hold yet. Every worker starts the scheduler, but a tick runs under
+a Postgres advisory lock, so one process crawls at a time and the per-source
+budgets hold however many workers there are. Known links just have date_scraped
+refreshed, which keeps them hot. New jobs go through store_jobs, so they are
+deduplicated and precomputed like any other ingest.
+
+A page that produced new listings is revisited after CRAWL_INTERVAL_MINUTES
+and unlocks the next page; a page with nothing new backs off up to
+CRAWL_MAX_INTERVAL_MINUTES. Queries users search for join the frontier.
+"""
+import asyncio
+import os
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from database import SessionLocal, advisory_lock
+from models import CrawlFrontier, JobScraped
+from .dedup import normalize_link
+from .http_scraper import HttpScraper
+from .ingest import store_jobs
+from .scrape_cache import normalize_query
+
+CRAWL_ENABLED = os.getenv("CRAWL_ENABLED", "1") != "0"
+CRAWL_QUERIES = [q for q in os.getenv(
+    "CRAWL_QUERIES",
+    "software engineer,data scientist,web developer,mobile app developer,"
+    "devops engineer,data analyst,machine learning engineer,qa engineer",
+).split(",") if q.strip()]
+CRAWL_TICK_SECONDS = float(os.getenv("CRAWL_TICK_SECONDS", "60"))
+CRAWL_BATCH = int(os.getenv("CRAWL_BATCH", "20"))  # frontier pages per tick
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "10"))  # deepest results page per query
+CRAWL_INTERVAL_MINUTES = float(os.getenv("CRAWL_INTERVAL_MINUTES", "60"))
+CRAWL_MAX_INTERVAL_MINUTES = float(os.getenv("CRAWL_MAX_INTERVAL_MINUTES", "1440"))
+# Claimed rows are not due again for this long, in case the tick dies mid-crawl
+CRAWL_LEASE_MINUTES = float(os.getenv("CRAWL_LEASE_MINUTES", "30"))
+
+# Per-source politeness: concurrent pages in flight and seconds between requests
+SOURCES = {
+    "Rozee.pk": {
+        "host": "www.rozee.pk",
+        "concurrency": int(os.getenv("ROZEE_CRAWL_CONCURRENCY", "2")),
+        "min_interval": float(os.getenv("ROZEE_CRAWL_INTERVAL", "1.0")),
+    },
+}
+DEFAULT_SOURCE = "Rozee.pk"
+
+crawl_scraper = HttpScraper(concurrency=sum(conf["concurrency"] for conf in SOURCES.values()))
+for _conf in SOURCES.values():
+    crawl_scraper.limiter.set_interval(_conf["host"], _conf["min_interval"])
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _enqueue_pages(db, entries):
+    """Insert frontier rows (source, query, page, next_run_at), keeping existing ones."""
+    if not entries:
+        return
+    stmt = pg_insert(CrawlFrontier).values([
+        {
+            "source": source,
+            "query": query,
+            "page": page,
+            "next_run_at": next_run_at,
+            "interval_minutes": CRAWL_INTERVAL_MINUTES,
+        }
+        for source, query, page, next_run_at in entries
+    ]).on_conflict_do_nothing(constraint="uq_crawl_frontier_page")
+    db.execute(stmt)
+
+
+def track_query(db, query, source=DEFAULT_SOURCE):
+    """Add a user search to the frontier; it was just scraped, so it is due later."""
+    query = normalize_query(query)
+    if query:
+        _enqueue_pages(db, [(source, query, 0, _now() + timedelta(minutes=CRAWL_INTERVAL_MINUTES))])
+        db.commit()
+
+
+def seed_frontier(db):
+    now = _now()
+    _enqueue_pages(db, [(DEFAULT_SOURCE, normalize_query(q), 0, now) for q in CRAWL_QUERIES])
+    db.commit()
+
+
+async def _fetch_listings(pages):
+    """Listing cards per (source, query, page) (None when blocked or failed)."""
+    budgets = {source: asyncio.Semaphore(conf["concurrency"]) for source, conf in SOURCES.items()}
+
+    async def one(source, query, page):
+        async with budgets[source]:
+            try:
+                return await crawl_scraper.scrape_page(query, page)
+            except httpx.HTTPError as e:
+                print(f"Crawl of '{query}' page {page} failed: {e}")
+                return None
+
+    return await asyncio.gather(*(one(*page) for page in pages))
+
+
+def crawl_once(db):
+    """Crawl the frontier pages that are due. Returns the number of new jobs stored."""
+    seed_frontier(db)
+
+    # Claim: rows locked by another crawler are skipped, and claimed rows are
+    # pushed out by the lease before the locks are released
+    due = (
+        db.query(CrawlFrontier)
+        .filter(CrawlFrontier.next_run_at <= _now(), CrawlFrontier.source.in_(list(SOURCES)))
+        .order_by(CrawlFrontier.next_run_at)
+        .limit(CRAWL_BATCH)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not due:
+        db.commit()
+        return 0
+    lease = _now() + timedelta(minutes=CRAWL_LEASE_MINUTES)
+    for entry in due:
+        entry.next_run_at = lease
+    # Plain values: commit expires the ORM rows, and the fetch coroutines run
+    # on the scraper's loop thread, which must not lazy-load through this session
+    claimed = [
+        (entry.id, entry.source, entry.query, entry.page, entry.interval_minutes, entry.failures or 0)
+        for entry in due
+    ]
+    db.commit()
+
+    listings = crawl_scraper.run(_fetch_listings([(source, query, page) for _, source, query, page, _, _ in claimed]))
+
+    # Incremental: only listings whose link we do not hold yet get a detail fetch
+    links = {normalize_link(card["link"]) for cards in listings if cards for card in cards} - {None}
+    known = {
+        link for (link,) in
+        db.query(JobScraped.link).filter(JobScraped.link.in_(links))
+    } if links else set()
+
+    new_jobs, new_per_entry, seen = [], [], set()
+    for cards in listings:
+        fresh = []
+        for card in cards or []:
+            link = normalize_link(card["link"])
+            if link and link not in known and link not in seen:
+                seen.add(link)
+                fresh.append(card)
+        new_per_entry.append(len(fresh))
+        new_jobs.extend(fresh)
+
+    if new_jobs:
+        crawl_scraper.run(crawl_scraper.fill_details(new_jobs))
+        store_jobs(db, new_jobs)
+    if known:
+        # Still listed: keep them inside the freshness window
+        db.query(JobScraped).filter(JobScraped.link.in_(known)).update(
+            {"date_scraped": date.today()}, synchronize_session=False
+        )
+
+    now = _now()
+    updates, next_pages = [], []
+    for (entry_id, source, query, page, interval, failures), cards, new in zip(claimed, listings, new_per_entry):
+        if cards is None:
+            failures += 1
+            interval = min(interval * 2, CRAWL_MAX_INTERVAL_MINUTES)
+        else:
+            failures = 0
+            if new:
+                interval = CRAWL_INTERVAL_MINUTES
+                if page + 1 < CRAWL_MAX_PAGES:
+                    next_pages.append((source, query, page + 1, now))
+            else:
+                interval = min(interval * 2, CRAWL_MAX_INTERVAL_MINUTES)
+        updates.append({
+            "id": entry_id,
+            "last_run_at": now,
+            "last_new": new,
+            "failures": failures,
+            "interval_minutes": interval,
+            "next_run_at": now + timedelta(minutes=interval),
+        })
+    db.bulk_update_mappings(CrawlFrontier, updates)
+    _enqueue_pages(db, next_pages)
+    db.commit()
+
+    print(f"Crawled {len(claimed)} frontier pages: {len(new_jobs)} new jobs, {len(known)} still listed")
+    return len(new_jobs)
+
+
+def start_crawler():
+    """
+    Crawl due frontier pages every CRAWL_TICK_SECONDS on a daemon thread;
+    a tick is skipped while another process holds the crawl lock.
+    """
+    def loop(stop):
+        while not stop.is_set():
+            try:
+                with advisory_lock("jobs.crawler") as acquired:
+                    if acquired:
+                        db = SessionLocal()
+                        try:
+                            crawl_once(db)
+                        except Exception as e:
+                            db.rollback()
+                            print("Crawl tick failed:", e)
+                        finally:
+                            db.close()
+            except Exception as e:
+                print("Crawl lock unavailable:", e)
+            stop.wait(CRAWL_TICK_SECONDS)
+
+    stop = threading.Event()
+    if CRAWL_ENABLED:
+        threading.Thread(target=loop, args=(stop,), name="job-crawler", daemon=True).start()
+    return stop
@@ -0,0 +1,193 @@
+# jobs/dedup.py
+"""
+Duplicate detection for scraped jobs.
+
+Exact duplicates share a normalized link (unique in jobs_scraped). Reposted
+ads usually get a new link but keep title, company, location and
+description, so each job also carries a 64-bit SimHash of that text. Two
+jobs are treated as the same posting only when title, company and location
+match exactly (after case and whitespace folding) and their SimHashes are
+within NEAR_DUP_DISTANCE bits (6 by default; small edits to a long ad move
+about 4-5 bits). Short texts move as many bits for a one-word change, so
+below NEAR_DUP_MIN_WORDS words the limit is NEAR_DUP_SHORT_DISTANCE.
+
+Each process keeps a SimHashIndex of the stored jobs; it is reloaded from
+jobs_scraped on the job index watcher's tick, so jobs that other processes
+ingest are seen as repost candidates too.
+"""
+import hashlib
+import os
+import re
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+NEAR_DUP_DISTANCE = int(os.getenv("NEAR_DUP_DISTANCE", "6"))
+NEAR_DUP_MIN_WORDS = int(os.getenv("NEAR_DUP_MIN_WORDS", "80"))
+NEAR_DUP_SHORT_DISTANCE = min(int(os.getenv("NEAR_DUP_SHORT_DISTANCE", "2")), NEAR_DUP_DISTANCE)
+
+# Query parameters that only track where a click came from
+_TRACKING_PARAMS = {"utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "ref", "src", "fbclid", "gclid"}
+_WORD = re.compile(r"\w+")
+# Split the 64 bits into NEAR_DUP_DISTANCE + 1 bands: by pigeonhole, any pair
+# within NEAR_DUP_DISTANCE bits agrees exactly on at least one band
+_BANDS = NEAR_DUP_DISTANCE + 1
+_BAND_EDGES = [round(64 * i / _BANDS) for i in range(_BANDS + 1)]
+
+
+def normalize_link(link):
+    """Canonical form of a job URL used as the dedup key, or None when it has no host."""
+    link = (link or "").strip()
+    if link.startswith("//"):
+        link = "https:" + link
+    parts = urlsplit(link)
+    if not parts.netloc:
+        return None  # blank or relative: every such link would collide on one key
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in _TRACKING_PARAMS
+    ))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", parts.netloc.lower(), path, query, ""))
+
+
+def simhash(*texts):
+    """64-bit SimHash over word 3-shingles, as a signed int (fits Postgres BIGINT)."""
+    words = _WORD.findall(" ".join(t or "" for t in texts).lower())
+    shingles = [" ".join(words[i:i + 3]) for i in range(max(len(words) - 2, 1))] if words else []
+    if not shingles:
+        return None
+
+    weights = [0] * 64
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    value = sum(1 << bit for bit in range(64) if weights[bit] > 0)
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def identity_key(title, company, location):
+    """Case/whitespace-folded (title, company, location); reposts must match it exactly."""
+    return tuple(" ".join((part or "").lower().split()) for part in (title, company, location))
+
+
+def near_dup_distance(description):
+    """Bit distance allowed for a job whose description is `description`."""
+    if len(_WORD.findall(description or "")) < NEAR_DUP_MIN_WORDS:
+        return NEAR_DUP_SHORT_DISTANCE
+    return NEAR_DUP_DISTANCE
+
+
+def _bands(value):
+    unsigned = value & 0xFFFFFFFFFFFFFFFF
+    return [
+        (band, unsigned >> lo & ((1 << (hi - lo)) - 1))
+        for band, (lo, hi) in enumerate(zip(_BAND_EDGES, _BAND_EDGES[1:]))
+    ]
+
+
+def hamming(a, b):
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count("1")
+
+
+class SimHashIndex:
+    """Banded lookup of job ids by SimHash, for near-duplicate checks at ingest."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._hashes = {}
+        self._keys = {}  # job id -> identity_key(), when known
+        self._lock = threading.Lock()
+
+    def add(self, job_id, value, key=None):
+        if value is None:
+            return
+        with self._lock:
+            self._hashes[job_id] = value
+            self._keys[job_id] = key
+            for band in _bands(value):
+                self._buckets.setdefault(band, set()).add(job_id)
+
+    def load(self, entries):
+        """Replace the contents with (job_id, simhash, identity key) entries."""
+        buckets, hashes, keys = {}, {}, {}
+        for job_id, value, key in entries:
+            if value is None:
+                continue
+            hashes[job_id] = value
+            keys[job_id] = key
+            for band in _bands(value):
+                buckets.setdefault(band, set()).add(job_id)
+        with self._lock:
+            self._buckets, self._hashes, self._keys = buckets, hashes, keys
+
+    def remove(self, job_id):
+        with self._lock:
+            value = self._hashes.pop(job_id, None)
+            self._keys.pop(job_id, None)
+            if value is None:
+                return
+            for band in _bands(value):
+                bucket = self._buckets.get(band)
+                if bucket:
+                    bucket.discard(job_id)
+
+    def find(self, value, max_distance=NEAR_DUP_DISTANCE, key=None):
+        """
+        Id of the closest stored job within max_distance bits (and, when
+        `key` is given, with the same identity key), or None.
+        """
+        if value is None:
+            return None
+        max_distance = min(max_distance, NEAR_DUP_DISTANCE)  # the bands only guarantee this much
+        with self._lock:
+            candidates = set()
+            for band in _bands(value):
+                candidates |= self._buckets.get(band, set())
+            if key is not None:
+                candidates = {job_id for job_id in candidates if self._keys.get(job_id) == key}
+            best = None
+            for job_id in candidates:
+                candidate = (hamming(value, self._hashes[job_id]), job_id)
+                if candidate[0] <= max_distance and (best is None or candidate < best):
+                    best = candidate
+            return best[1] if best else None
+
+
+_dedup_index = None
+_build_lock = threading.Lock()
+
+
+def _stored_fingerprints():
+    from database import SessionLocal
+    from models import JobScraped
+
+    db = SessionLocal()
+    try:
+        return [
+            (job_id, value, identity_key(title, company, location))
+            for job_id, value, title, company, location in db.query(
+                JobScraped.id, JobScraped.simhash, JobScraped.title, JobScraped.company, JobScraped.location
+            ).filter(JobScraped.simhash.isnot(None))
+        ]
+    finally:
+        db.close()
+
+
+def get_dedup_index():
+    """Process-wide SimHash index, loaded from jobs_scraped on first use."""
+    global _dedup_index
+    if _dedup_index is None:
+        with _build_lock:
+            if _dedup_index is None:
+                index = SimHashIndex()
+                index.load(_stored_fingerprints())
+                _dedup_index = index
+    return _dedup_index
+
+
+def reload_dedup_index():
+    """Re-read jobs_scraped so jobs stored or archived by other processes are reflected."""
+    if _dedup_index is not None:  # otherwise the first get_dedup_index() loads it
+        _dedup_index.load(_stored_fingerprints())
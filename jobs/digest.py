@@ -0,0 +1,139 @@
+# jobs/digest.py
+"""
+Bulk matching for the nightly "top jobs for you" digests.
+
+Instead of one /jobs/match call per user, profiles are scored in blocks as a
+users x jobs matrix against the resident job index: one dense product for the
+semantic term, two sparse products for the skill overlaps, then a row-wise
+argpartition for each user's top K. Results replace the users' previous rows
+in the job_digests table.
+"""
+import time
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, insert
+
+from models import JobDigest, Profile
+from .index import get_job_index, vector_scores
+from .matcher import SCORE_WEIGHTS, user_features_batch
+
+DIGEST_PROFILE_BATCH = 1000  # profiles loaded / featurized per round trip
+DIGEST_SCORE_BLOCK = 256     # users scored per dense block (block x jobs float32)
+
+
+def _user_skill_matrix(vocab, skill_sets, n_skills):
+    """CSR users x skill indicator matrix, restricted to skills the corpus knows."""
+    rows = [vocab.lookup(skills) for skills in skill_sets]
+    rows = [ids[ids < n_skills] for ids in rows]
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.concatenate(rows) if rows else np.empty(0, dtype=np.int32)
+    data = np.ones(len(indices), dtype=np.float32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(rows), n_skills))
+
+
+def _overlap(user_matrix, job_matrix_t, job_counts):
+    """|user & job| / |job| for every (user, job) pair."""
+    hits = (user_matrix @ job_matrix_t).toarray().astype(np.float32)
+    return np.divide(hits, job_counts, out=np.zeros_like(hits), where=job_counts > 0)
+
+
+def score_users(features, corpus, vocab, top_k):
+    """
+    Top-k (job_ids, scores) per user for a list of user feature dicts, scored
+    against an index snapshot in blocks of DIGEST_SCORE_BLOCK users.
+    """
+    n_jobs = corpus["n_alive"]
+    if n_jobs == 0 or not features:
+        return [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in features]
+
+    k = min(top_k, n_jobs)
+    skills_t = corpus["skills"].T.tocsr()
+    extracted_t = corpus["extracted"].T.tocsr()
+    n_skills = skills_t.shape[0]
+
+    results = []
+    for start in range(0, len(features), DIGEST_SCORE_BLOCK):
+        block = features[start:start + DIGEST_SCORE_BLOCK]
+
+        user_exp = np.array([f["exp"] for f in block], dtype=np.float32)
+        user_skills = _user_skill_matrix(vocab, [f["skills"] for f in block], n_skills)
+        user_extracted = _user_skill_matrix(vocab, [f["extracted"] for f in block], n_skills)
+
+        scores = SCORE_WEIGHTS["explicit"] * _overlap(user_skills, skills_t, corpus["skill_counts"])
+        scores += SCORE_WEIGHTS["extracted"] * _overlap(user_extracted, extracted_t, corpus["extracted_counts"])
+        scores += SCORE_WEIGHTS["experience"] * (1 - np.abs(user_exp[:, None] - corpus["exp"][None, :]))
+        if SCORE_WEIGHTS["semantic"]:
+            user_vecs = np.stack([f["embedding"] for f in block])
+            scores += SCORE_WEIGHTS["semantic"] * np.clip(vector_scores(corpus, user_vecs), 0.0, 1.0)
+        if corpus["alive"] is not None:
+            scores[:, ~corpus["alive"]] = -np.inf  # archived since the snapshot
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        for row in range(len(block)):
+            results.append((corpus["ids"][top[row]], top_scores[row]))
+    return results
+
+
+def run_digest(db, emails=None, top_k=20):
+    """
+    Score every profile (or only `emails`) against the job corpus and store
+    each user's top_k jobs in job_digests. Returns a small run summary.
+    """
+    index = get_job_index()
+    corpus = index.snapshot()
+    started = time.perf_counter()
+    users_done = 0
+    last_id = 0
+
+    while True:
+        query = db.query(Profile.id, Profile.user_email, Profile.skills, Profile.projects)
+        if emails:
+            query = query.filter(Profile.user_email.in_(emails))
+        batch = (
+            query.filter(Profile.id > last_id)
+            .order_by(Profile.id)
+            .limit(DIGEST_PROFILE_BATCH)
+            .all()
+        )
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        users = [{"skills": p.skills or [], "projects": p.projects or []} for p in batch]
+        ranked = score_users(user_features_batch(users), corpus, index.vocab, top_k)
+
+        rows = []
+        for profile, (job_ids, scores) in zip(batch, ranked):
+            for rank, (job_id, score) in enumerate(zip(job_ids, scores), start=1):
+                rows.append({
+                    "user_email": profile.user_email,
+                    "job_id": int(job_id),
+                    "rank": rank,
+                    "score": round(float(score), 3),
+                    "corpus_version": corpus["version"],
+                })
+
+        batch_emails = [p.user_email for p in batch]
+        db.execute(delete(JobDigest).where(JobDigest.user_email.in_(batch_emails)))
+        if rows:
+            db.execute(insert(JobDigest), rows)
+        db.commit()
+
+        users_done += len(batch)
+        elapsed = time.perf_counter() - started
+        print(f"  Digest: {users_done} users scored ({users_done / max(elapsed, 1e-9):.0f} users/s)")
+
+    return {
+        "users": users_done,
+        "jobs": len(corpus["ids"]),
+        "corpus_version": corpus["version"],
+        "seconds": round(time.perf_counter() - started, 2),
+    }
@@ -0,0 +1,88 @@
+# jobs/embedding_store.py
+"""
+Memory-mapped snapshots of the job embedding matrix.
+
+A snapshot is a directory holding ids.npy (int64 job ids) and vectors.npy
+(one float32 or float16 row per id) plus meta.json. The CURRENT file names
+the live snapshot; publishing writes a new directory and then replaces
+CURRENT atomically, so a reader sees either the old or the new snapshot and
+never a partial one. Every worker process maps the same files, so the page
+cache holds one copy of the matrix however many workers run, and a warm
+start is a file map instead of deserializing every JobScraped.embedding blob.
+Vectors are mapped copy-on-write: a worker refreshing a row only privately
+copies the page it writes to.
+"""
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", "job_embeddings")
+EMBEDDING_STORE_DTYPE = os.getenv("EMBEDDING_STORE_DTYPE", "float32")  # float16 halves the mapping
+EMBEDDING_STORE_KEEP = int(os.getenv("EMBEDDING_STORE_KEEP", "3"))  # snapshots kept on disk
+EMBEDDING_STORE_FLUSH_SECONDS = float(os.getenv("EMBEDDING_STORE_FLUSH_SECONDS", "60"))
+
+
+class EmbeddingStore:
+    def __init__(self, directory=EMBEDDING_STORE_DIR, dtype=EMBEDDING_STORE_DTYPE):
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+
+    @property
+    def _pointer(self):
+        return os.path.join(self.directory, "CURRENT")
+
+    def current(self):
+        """Name of the live snapshot, or None."""
+        try:
+            with open(self._pointer) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self, name=None):
+        """(name, ids, vectors) of a snapshot, memory-mapped; None when there is none."""
+        name = name or self.current()
+        if name is None:
+            return None
+        path = os.path.join(self.directory, name)
+        try:
+            ids = np.load(os.path.join(path, "ids.npy"), mmap_mode="r")
+            vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="c")
+        except FileNotFoundError:
+            return None
+        return name, ids, vectors
+
+    def publish(self, ids, vectors, version=None):
+        """Write a new snapshot and make it current. Returns its name."""
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"snap-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        tmp = os.path.join(self.directory, f".tmp-{name}")
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, "ids.npy"), np.asarray(ids, dtype=np.int64))
+        np.save(os.path.join(tmp, "vectors.npy"), np.asarray(vectors, dtype=self.dtype))
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({"rows": len(ids), "dtype": self.dtype.name, "version": version}, f)
+        os.rename(tmp, os.path.join(self.directory, name))
+
+        pointer_tmp = f"{self._pointer}.{uuid.uuid4().hex[:8]}"
+        with open(pointer_tmp, "w") as f:
+            f.write(name)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pointer_tmp, self._pointer)
+        self._prune(keep=name)
+        return name
+
+    def _prune(self, keep):
+        # Workers still mapping a removed snapshot keep their pages until they remap
+        snapshots = sorted(d for d in os.listdir(self.directory) if d.startswith("snap-"))
+        for name in snapshots[:-EMBEDDING_STORE_KEEP]:
+            if name != keep:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+
+embedding_store = EmbeddingStore()
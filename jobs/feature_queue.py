@@ -0,0 +1,89 @@
+# jobs/feature_queue.py
+"""
+Background match-feature precomputation for ingested jobs.
+
+Ingest only writes rows; the ids it touched are queued here and a single
+worker thread drains the queue in SKILL_BATCH_SIZE batches, runs
+precompute_jobs on them, commits, and adds the finished rows to the job
+index. Bulk crawls therefore pay for the database write only, and NLP work
+is batched across searches instead of running per request.
+"""
+import queue
+import threading
+
+from database import SessionLocal
+from models import JobScraped
+from .matcher import SKILL_BATCH_SIZE, precompute_jobs
+
+
+class FeatureQueue:
+    def __init__(self, batch_size=SKILL_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+
+    def enqueue(self, job_ids):
+        job_ids = [job_id for job_id in job_ids if job_id is not None]
+        if not job_ids:
+            return
+        self._ensure_worker()
+        for job_id in job_ids:
+            self._queue.put(job_id)
+
+    def join(self):
+        """Block until everything queued so far has been processed."""
+        self._queue.join()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="job-features", daemon=True)
+                self._worker.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]  # wait for work
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self.process(batch)
+                self.processed += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                print(f"Feature precompute failed for {len(batch)} jobs:", e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def process(self, job_ids):
+        from .index import get_job_index
+
+        db = SessionLocal(expire_on_commit=False)  # rows are read again by the index
+        try:
+            jobs = db.query(JobScraped).filter(JobScraped.id.in_(set(job_ids))).all()
+            precompute_jobs(jobs, db)
+            # Matchable with full features without rebuilding the index
+            get_job_index().add(jobs)
+            # Share the new vectors with the other workers (throttled)
+            get_job_index().maybe_publish()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def stats(self):
+        return {"pending": self._queue.qsize(), "processed": self.processed, "failed": self.failed}
+
+
+feature_queue = FeatureQueue()
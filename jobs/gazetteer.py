@@ -0,0 +1,188 @@
+# jobs/gazetteer.py
+"""
+Dictionary skill matcher: a token trie over every skill we have seen, scanned
+left to right with longest match, plus a synonym table so "js", "JavaScript"
+and "javascript" all come out as one canonical skill. The scan is linear in
+the text length, which makes it the default skill extractor for ingest and
+matching; the spaCy NER model stays available as an optional enrichment.
+
+The vocabulary is SEED_SKILLS plus the skill_vocabulary.txt file generated
+from the job corpus by scripts/build_skill_vocabulary.py. It does not grow
+at runtime, so every worker extracts the same skills from the same text.
+"""
+import os
+import re
+import threading
+
+# alias -> canonical skill (all lowercase)
+SYNONYMS = {
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "py": "python",
+    "python3": "python",
+    "k8s": "kubernetes",
+    "reactjs": "react",
+    "react.js": "react",
+    "nodejs": "node.js",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "angularjs": "angular",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "sklearn": "scikit-learn",
+    "scikit learn": "scikit-learn",
+    "ml": "machine learning",
+    "nlp": "natural language processing",
+    "ai": "artificial intelligence",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "google cloud platform": "google cloud",
+    "ms excel": "excel",
+    "microsoft excel": "excel",
+    "c sharp": "c#",
+    "cpp": "c++",
+    "dotnet": ".net",
+    "asp.net core": "asp.net",
+    "ci/cd": "ci cd",
+    "restful": "rest api",
+    "restful api": "rest api",
+    "rest apis": "rest api",
+}
+
+# Always known, even on an empty corpus. Words that are also plain English
+# ("go", "rest", "swift") only appear in an unambiguous spelling.
+SEED_SKILLS = [
+    "python", "java", "javascript", "typescript", "c++", "c#", "golang", "php",
+    "kotlin", "flutter", "react", "angular", "vue", "node.js", "django",
+    "flask", "fastapi", "spring boot", "laravel", ".net", "asp.net", "html", "css", "sql",
+    "mysql", "postgresql", "mongodb", "redis", "docker", "kubernetes", "aws", "azure",
+    "google cloud", "linux", "git", "ci cd", "rest api", "graphql", "etl", "tensorflow",
+    "keras", "pytorch", "pandas", "numpy", "scikit-learn", "machine learning",
+    "deep learning", "natural language processing", "computer vision",
+    "artificial intelligence", "data analysis", "power bi", "tableau",
+]
+
+# Single words that are plain English far more often than skill names
+_AMBIGUOUS = {"go", "rest", "excel", "node", "cv", "spring", "swift", "dart", "ruby", "rust"}
+
+# "/" separates tokens: "Python/Django", "HTML/CSS", "CI/CD" -> two tokens each
+_TOKEN = re.compile(r"[a-z0-9.+#][a-z0-9.+#-]*")
+_MAX_SKILL_TOKENS = 4
+
+SKILL_VOCABULARY_PATH = os.getenv(
+    "SKILL_VOCABULARY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_vocabulary.txt")
+)
+
+
+def tokenize(text):
+    tokens = []
+    for tok in _TOKEN.findall((text or "").lower()):
+        tok = tok.rstrip(".,-")  # sentence punctuation, keeps "node.js" / "c++" / ".net"
+        if tok:
+            tokens.append(tok)
+    return tokens
+
+
+def skill_key(skill):
+    """Token-joined form of a skill label, or None when it is not usable as a vocabulary entry."""
+    tokens = tokenize(skill)
+    if not tokens or len(tokens) > _MAX_SKILL_TOKENS:
+        return None
+    if len(tokens) == 1 and (len(tokens[0]) < 2 or tokens[0] in _AMBIGUOUS):
+        return None  # "c", "r", "go"... match too much prose
+    return " ".join(tokens)
+
+
+class SkillGazetteer:
+    def __init__(self, skills=(), synonyms=None):
+        self.synonyms = dict(SYNONYMS if synonyms is None else synonyms)
+        self._trie = {}
+        self._lock = threading.Lock()
+        self.size = 0
+        for alias, canonical in self.synonyms.items():
+            self._insert(tokenize(alias), canonical)
+        self.add_skills(SEED_SKILLS)
+        self.add_skills(skills)
+
+    def normalize(self, skill):
+        """Canonical form of one skill string."""
+        key = " ".join(tokenize(skill))
+        return self.synonyms.get(key, key)
+
+    def add_skills(self, skills):
+        """Add vocabulary entries; called while the gazetteer is built."""
+        with self._lock:
+            for skill in skills or []:
+                key = skill_key(skill)
+                if key is not None:
+                    self._insert(key.split(" "), self.synonyms.get(key, key))
+
+    def _insert(self, tokens, canonical):
+        if not tokens:
+            return
+        node = self._trie
+        for tok in tokens:
+            node = node.setdefault(tok, {})
+        if None not in node:
+            self.size += 1
+        node[None] = canonical  # None marks the end of a skill
+
+    def extract(self, text):
+        """Canonical skills found in `text`, in order of first appearance."""
+        tokens = tokenize(text)
+        found = {}
+        i = 0
+        while i < len(tokens):
+            node = self._trie
+            match, match_end = None, i
+            j = i
+            while j < len(tokens) and tokens[j] in node:
+                node = node[tokens[j]]
+                j += 1
+                if None in node:
+                    match, match_end = node[None], j
+            if match is not None:
+                found.setdefault(match, None)
+                i = match_end
+            else:
+                i += 1
+        return list(found)
+
+
+_gazetteer = None
+_build_lock = threading.Lock()
+
+
+def load_corpus_skills(db):
+    """Skill label -> number of scraped jobs carrying it (see scripts/build_skill_vocabulary.py)."""
+    from models import JobScraped
+
+    counts = {}
+    for job_skills, extracted in db.query(JobScraped.skills, JobScraped.extracted_skills).yield_per(5000):
+        labels = {s for s in (job_skills or []) if isinstance(s, str)}
+        labels.update(s for s in (extracted or []) if isinstance(s, str))
+        for key in filter(None, map(skill_key, labels)):
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def load_vocabulary(path=None):
+    """Skills listed in the vocabulary file, one per line; [] when it does not exist."""
+    path = path or SKILL_VOCABULARY_PATH
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    except FileNotFoundError:
+        print(f"No skill vocabulary at {path} (run scripts/build_skill_vocabulary.py); using seed skills only")
+        return []
+
+
+def get_gazetteer():
+    """Process-wide gazetteer over the seed skills and the vocabulary file."""
+    global _gazetteer
+    if _gazetteer is None:
+        with _build_lock:
+            if _gazetteer is None:
+                _gazetteer = SkillGazetteer(load_vocabulary())
+    return _gazetteer
@@ -0,0 +1,191 @@
+# jobs/http_scraper.py
+"""
+HTTP-first Rozee scraper.
+
+Listing and detail pages are fetched over one pooled httpx.AsyncClient that
+lives on a background event loop, with bounded concurrency and a minimum
+interval between requests to the same host. Pages are parsed with
+jobs.parsers. Only when the first listing page is refused, or comes back as a
+CAPTCHA / JS wall, does the search fall back to the Selenium browser.
+"""
+import asyncio
+import os
+import threading
+import time
+import urllib.parse
+
+import httpx
+
+from .parsers import has_results_list, looks_blocked, parse_detail, parse_listing
+
+SCRAPE_MAX_RESULTS = int(os.getenv("SCRAPE_MAX_RESULTS", "60"))
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "8"))
+SCRAPE_HOST_INTERVAL = float(os.getenv("SCRAPE_HOST_INTERVAL", "0.25"))  # seconds between hits per host
+SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", "15"))
+
+ROZEE_SEARCH_URL = "https://www.rozee.pk/job/jsearch/q/"
+ROZEE_PAGE_SIZE = 20  # cards per results page; later pages are /fpn/<offset>
+
+_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def listing_url(query, page=0):
+    url = ROZEE_SEARCH_URL + urllib.parse.quote(query)
+    return url if page == 0 else f"{url}/fpn/{page * ROZEE_PAGE_SIZE}"
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host by at least `interval` seconds."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._intervals = {}  # per-host overrides
+        self._next = {}
+        self._locks = {}
+
+    def set_interval(self, host, interval):
+        self._intervals[host] = interval
+
+    async def wait(self, url):
+        host = urllib.parse.urlsplit(url).netloc
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(host, 0.0))
+            self._next[host] = start + self._intervals.get(host, self.interval)
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class HttpScraper:
+    def __init__(self, concurrency=SCRAPE_CONCURRENCY, host_interval=SCRAPE_HOST_INTERVAL):
+        self.concurrency = concurrency
+        self.host_interval = host_interval
+        self._loop = None
+        self._client = None
+        self._semaphore = None
+        self.limiter = HostRateLimiter(host_interval)
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        """Start the background loop and client once; every search reuses them."""
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="http-scraper", daemon=True).start()
+
+            async def setup():
+                self._client = httpx.AsyncClient(
+                    headers=_HEADERS,
+                    timeout=SCRAPE_TIMEOUT,
+                    follow_redirects=True,
+                    limits=httpx.Limits(
+                        max_connections=self.concurrency,
+                        max_keepalive_connections=self.concurrency,
+                    ),
+                )
+                self._semaphore = asyncio.Semaphore(self.concurrency)
+
+            asyncio.run_coroutine_threadsafe(setup(), loop).result()
+            self._loop = loop
+
+    def run(self, coro):
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+    async def fetch(self, url):
+        async with self._semaphore:
+            await self.limiter.wait(url)
+            response = await self._client.get(url)
+            response.raise_for_status()
+            return response.text
+
+    async def _fill_detail(self, job):
+        try:
+            html = await self.fetch(job["link"])
+        except httpx.HTTPError as e:
+            print(f"Detail fetch failed for {job['link']}: {e}")
+            return
+        if not looks_blocked(html):
+            job["full_desc"] = parse_detail(html) or job["preview_desc"]
+
+    async def fill_details(self, jobs):
+        """Fetch full descriptions for the given cards concurrently."""
+        await asyncio.gather(*(self._fill_detail(job) for job in jobs if job["link"]))
+        return jobs
+
+    async def scrape_page(self, query, page):
+        """
+        Job cards on one results page (descriptions not yet fetched), or None
+        when the site served a CAPTCHA / JS wall instead. A rendered results
+        page without cards (no matches) gives [].
+        """
+        html = await self.fetch(listing_url(query, page))
+        if looks_blocked(html):
+            return None
+        cards = parse_listing(html)
+        if not cards and not has_results_list(html):
+            return None  # JS-rendered shell we cannot read
+        return cards
+
+    async def scrape(self, query, max_results=SCRAPE_MAX_RESULTS):
+        """
+        Jobs for `query` with full descriptions ([] when nothing matches), or
+        None when the first listing page was refused or walled and the caller
+        should fall back to a browser.
+        """
+        jobs, seen = [], set()
+        page = 0
+        while len(jobs) < max_results:
+            try:
+                cards = await self.scrape_page(query, page)
+            except httpx.HTTPError as e:
+                print(f"Listing fetch failed for '{query}' page {page}: {e}")
+                # A 403/429/503 or dropped connection on the first page is the
+                # bot wall answering; later pages keep what was already found
+                if page == 0:
+                    return None
+                break
+            if cards is None:
+                if page == 0:
+                    return None
+                break
+            cards = [c for c in cards if c["link"] not in seen]
+            if not cards:
+                break
+            seen.update(c["link"] for c in cards)
+            jobs.extend(cards)
+            page += 1
+
+        return await self.fill_details(jobs[:max_results])
+
+
+http_scraper = HttpScraper()
+
+
+def scrape_jobs(query, max_results=SCRAPE_MAX_RESULTS):
+    """Scrape over HTTP; use the Selenium browser only if the site blocks us."""
+    started = time.perf_counter()
+    jobs = http_scraper.run(http_scraper.scrape(query, max_results))
+    if jobs is None:
+        print(f"HTTP scrape of '{query}' hit a CAPTCHA/JS wall; falling back to browser")
+        from .scraper import scrape_jobs as browser_scrape_jobs
+        return browser_scrape_jobs(query)
+
+    print(f"HTTP scrape of '{query}': {len(jobs)} jobs in {time.perf_counter() - started:.1f}s")
+    return jobs
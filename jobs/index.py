@@ -0,0 +1,466 @@
+# jobs/index.py
+"""
+Process-resident index over the cached job match features.
+
+Every JobScraped row lives here as one row of a float32 embedding matrix plus
+its skill sets and experience score, so /jobs/match scores the whole corpus
+with a matrix-vector product instead of walking ORM rows. The matrix is a
+memory-mapped snapshot shared by all workers (see jobs.embedding_store) plus
+an in-process block for rows ingested since it was published.
+Only hot jobs (see jobs.lifecycle) are loaded.
+Skills are interned to integer ids through a shared SkillVocabulary and kept
+as sparse job x skill matrices; their CSC columns double as the inverted
+postings (skill -> jobs), so overlap ratios only touch jobs that share a skill
+with the user. The index is built once at startup and then grown in place as
+/jobs/search ingests new jobs.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from scipy import sparse
+
+from database import SessionLocal
+from models import JobScraped
+from .dedup import reload_dedup_index
+from .embedding_store import EMBEDDING_STORE_FLUSH_SECONDS, embedding_store
+from .lifecycle import hot_jobs_filter
+from .matcher import DEFAULT_EXPERIENCE, EMBEDDING_DIM, deserialize_vec, normalize_skills
+
+_INITIAL_CAPACITY = 1024
+# Rows of a float16 snapshot widened to float32 at a time while scoring
+_SCORE_CHUNK = 8192
+_NO_SKILLS = np.empty(0, dtype=np.int32)
+
+
+class SkillVocabulary:
+    """Normalized skill string <-> dense integer id."""
+
+    def __init__(self):
+        self._ids = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def intern(self, skills):
+        """Sorted unique ids for `skills`, adding unseen skills to the vocabulary."""
+        ids = {self._ids.setdefault(skill, len(self._ids)) for skill in skills if skill}
+        return np.array(sorted(ids), dtype=np.int32) if ids else _NO_SKILLS
+
+    def lookup(self, skills):
+        """Ids of the known skills in `skills`; unknown skills cannot overlap any job."""
+        ids = {self._ids[skill] for skill in skills if skill in self._ids}
+        return np.array(sorted(ids), dtype=np.int32) if ids else _NO_SKILLS
+
+
+def skill_matrix(rows, n_skills):
+    """CSC job x skill indicator matrix and per-job skill counts from id arrays."""
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.concatenate(rows) if rows else _NO_SKILLS
+    data = np.ones(len(indices), dtype=np.float32)
+    csr = sparse.csr_matrix((data, indices, indptr), shape=(len(rows), n_skills))
+    return csr.tocsc(), lengths.astype(np.float32)
+
+
+def overlap_ratio(matrix, counts, skill_ids):
+    """
+    |user & job| / |job| for every row, touching only the columns (postings)
+    of the user's skills. Jobs without skills get 0.
+    """
+    n = matrix.shape[0]
+    skill_ids = skill_ids[skill_ids < matrix.shape[1]]  # interned after this snapshot
+    if n == 0 or len(skill_ids) == 0:
+        return np.zeros(n, dtype=np.float32)
+    hits = np.asarray(matrix[:, skill_ids].sum(axis=1), dtype=np.float32).ravel()
+    return np.divide(hits, counts, out=np.zeros(n, dtype=np.float32), where=counts > 0)
+
+
+class JobIndex:
+    def __init__(self, dim, store=None):
+        self.dim = dim
+        self.store = store
+        self.vocab = SkillVocabulary()
+        self._lock = threading.Lock()
+        self._reset(_INITIAL_CAPACITY)
+        self.version = 0
+        self.built_at = None
+        self.build_seconds = None
+        self.snapshot_name = None
+        self._published_at = 0.0
+        self._dirty = False
+
+    def _reset(self, capacity, base=None):
+        # Rows [0, len(base)) live in the mapped snapshot, later rows in _vectors
+        self._base = base if base is not None else np.zeros((0, self.dim), dtype=np.float32)
+        n_base = len(self._base)
+        self._vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        self._ids = np.zeros(n_base + capacity, dtype=np.int64)
+        self._exp = np.zeros(n_base + capacity, dtype=np.float32)
+        self._dates = np.zeros(n_base + capacity, dtype=np.int32)  # date_posted ordinal, 0 = undated
+        self._alive = np.zeros(n_base + capacity, dtype=bool)
+        # False for rows whose features are not precomputed yet (zero vector)
+        self._has_vec = np.zeros(n_base + capacity, dtype=bool)
+        self._has_vec[:n_base] = True
+        self._n_alive = 0
+        self._skill_ids = []
+        self._extracted_ids = []
+        self._rows = {}
+        self._size = 0
+        self._matrices = None  # (size, skills, extracted), rebuilt lazily
+
+    def __len__(self):
+        return self._n_alive
+
+    @property
+    def is_built(self):
+        return self.built_at is not None
+
+    # ── Loading ──────────────────────────────────────────────────────────────
+    def build(self, db=None, from_store=True):
+        """
+        (Re)load every hot (non-stale) job. With a published embedding
+        snapshot the vectors are memory-mapped and only the skill and
+        experience columns are read from the database; otherwise all features
+        are read and a snapshot is published for the other workers.
+        """
+        own_session = db is None
+        db = db or SessionLocal()
+        started = time.perf_counter()
+        loaded = self.store.load() if (from_store and self.store is not None) else None
+        if loaded is not None and (loaded[2].ndim != 2 or loaded[2].shape[1] != self.dim):
+            loaded = None
+        try:
+            columns = [
+                JobScraped.id, JobScraped.skills, JobScraped.extracted_skills,
+                JobScraped.exp_score, JobScraped.date_posted,
+            ]
+            if loaded is None:
+                columns.append(JobScraped.embedding)
+            rows = db.query(*columns).filter(hot_jobs_filter()).all()
+
+            unmapped, unmapped_vecs = rows, {}
+            if loaded is not None:
+                mapped = set(loaded[1].tolist())
+                unmapped = [row for row in rows if row.id not in mapped]
+                ids = [row.id for row in unmapped]
+                for start in range(0, len(ids), 5000):
+                    for job_id, data in db.query(JobScraped.id, JobScraped.embedding).filter(
+                        JobScraped.id.in_(ids[start:start + 5000])
+                    ):
+                        unmapped_vecs[job_id] = deserialize_vec(data) if data else None
+        finally:
+            if own_session:
+                db.close()
+
+        with self._lock:
+            if loaded is None:
+                self._reset(max(_INITIAL_CAPACITY, len(rows)))
+                for row in rows:
+                    self._put(row)
+                self.snapshot_name = None
+            else:
+                name, ids, vectors = loaded
+                self._reset(max(_INITIAL_CAPACITY, len(unmapped)), base=vectors)
+                by_id = {row.id: row for row in rows}
+                for job_id in ids.tolist():
+                    row = self._row_for(job_id)
+                    job = by_id.get(job_id)
+                    if job is not None:
+                        self._put_features(row, job)
+                    # else archived since the snapshot; stays dead until the next publish
+                for job in unmapped:
+                    self._put(job, unmapped_vecs.get(job.id))
+                self.snapshot_name = name
+            self.version += 1
+            self.built_at = datetime.now(timezone.utc)
+            self.build_seconds = time.perf_counter() - started
+            self._dirty = loaded is None or any(vec is not None for vec in unmapped_vecs.values())
+
+        source = f"snapshot {self.snapshot_name}" if loaded is not None else "database"
+        print(f"Job index built from {source}: {self._n_alive} jobs in {self.build_seconds:.2f}s")
+        if self.store is not None and self._dirty:
+            self.publish()
+
+    def add(self, jobs):
+        """
+        Incrementally add (or refresh) jobs after ingest. Accepts JobScraped
+        objects whose match features have already been precomputed.
+        """
+        if not jobs:
+            return
+        with self._lock:
+            for job in jobs:
+                self._put(job)
+            self._matrices = None
+            self.version += 1
+            self._dirty = True
+
+    _FROM_JOB = object()
+
+    def _put(self, job, vec=_FROM_JOB):
+        row = self._row_for(job.id)
+        if vec is JobIndex._FROM_JOB:
+            vec = deserialize_vec(job.embedding) if job.embedding else None
+        if vec is None or vec.shape[0] != self.dim:
+            vec = None  # not precomputed yet: scores zero on the semantic term
+        self._set_vector(row, vec)
+        self._put_features(row, job)
+
+    def _row_for(self, job_id):
+        row = self._rows.get(job_id)
+        if row is None:
+            if self._size == len(self._ids):
+                self._grow()
+            row = self._size
+            self._size += 1
+            self._rows[job_id] = row
+            self._ids[row] = job_id
+            self._skill_ids.append(_NO_SKILLS)
+            self._extracted_ids.append(_NO_SKILLS)
+        return row
+
+    def _put_features(self, row, job):
+        self._exp[row] = job.exp_score if job.exp_score is not None else DEFAULT_EXPERIENCE
+        self._dates[row] = job.date_posted.toordinal() if job.date_posted else 0
+        self._skill_ids[row] = self.vocab.intern(normalize_skills(job.skills))
+        self._extracted_ids[row] = self.vocab.intern(job.extracted_skills or [])
+        if not self._alive[row]:
+            self._alive[row] = True
+            self._n_alive += 1
+
+    def _set_vector(self, row, vec):
+        """Store a row's vector; None zeroes it and keeps it out of published snapshots."""
+        n_base = len(self._base)
+        self._has_vec[row] = vec is not None
+        if vec is None:
+            vec = 0.0
+        if row < n_base:
+            self._base[row] = vec  # copy-on-write: only this page becomes private
+        else:
+            self._vectors[row - n_base] = vec
+
+    def _grow(self):
+        n_base = len(self._base)
+        capacity = len(self._vectors) * 2
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:self._size - n_base] = self._vectors[:self._size - n_base]
+        ids = np.zeros(n_base + capacity, dtype=np.int64)
+        ids[:self._size] = self._ids[:self._size]
+        exp = np.zeros(n_base + capacity, dtype=np.float32)
+        exp[:self._size] = self._exp[:self._size]
+        dates = np.zeros(n_base + capacity, dtype=np.int32)
+        dates[:self._size] = self._dates[:self._size]
+        alive = np.zeros(n_base + capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        has_vec = np.zeros(n_base + capacity, dtype=bool)
+        has_vec[:self._size] = self._has_vec[:self._size]
+        self._vectors, self._ids, self._exp, self._dates = vectors, ids, exp, dates
+        self._alive, self._has_vec = alive, has_vec
+
+    # ── Embedding snapshots (see jobs.embedding_store) ───────────────────────
+    def _gather_vectors(self, rows):
+        n_base = len(self._base)
+        out = np.empty((len(rows), self.dim), dtype=np.float32)
+        in_base = rows < n_base
+        out[in_base] = self._base[rows[in_base]]
+        out[~in_base] = self._vectors[rows[~in_base] - n_base]
+        return out
+
+    def publish(self):
+        """
+        Write the live rows' vectors as a new store snapshot and re-map this
+        index onto it, so its vectors are shared with the other workers.
+        Rows still waiting for their features are not published; they stay in
+        the in-process block until feature_queue adds their vectors.
+        """
+        if self.store is None:
+            return None
+        with self._lock:
+            version = self.version
+            alive = self._alive[:self._size]
+            live = np.flatnonzero(alive & self._has_vec[:self._size])
+            pending = np.flatnonzero(alive & ~self._has_vec[:self._size])
+            ids = self._ids[live].copy()
+            vectors = self._gather_vectors(live)
+            self._dirty = False
+            self._published_at = time.monotonic()
+        name = self.store.publish(ids, vectors, version)
+        _, _, mapped = self.store.load(name)
+
+        with self._lock:
+            if self.version != version:
+                # Jobs were added while writing; the next publish picks them up
+                self._dirty = True
+                return name
+            skill_ids = [self._skill_ids[row] for row in live]
+            extracted_ids = [self._extracted_ids[row] for row in live]
+            exp = self._exp[live]
+            dates = self._dates[live]
+            pending_rows = [
+                (int(self._ids[row]), self._exp[row], self._dates[row], self._skill_ids[row], self._extracted_ids[row])
+                for row in pending
+            ]
+            self._reset(_INITIAL_CAPACITY, base=mapped)
+            self._size = self._n_alive = len(live)
+            self._ids[:self._size] = ids
+            self._exp[:self._size] = exp
+            self._dates[:self._size] = dates
+            self._alive[:self._size] = True
+            self._skill_ids, self._extracted_ids = skill_ids, extracted_ids
+            self._rows = {job_id: row for row, job_id in enumerate(ids.tolist())}
+            for job_id, exp, posted, job_skills, job_extracted in pending_rows:
+                row = self._row_for(job_id)
+                self._exp[row], self._dates[row] = exp, posted
+                self._skill_ids[row], self._extracted_ids[row] = job_skills, job_extracted
+                self._alive[row] = True
+                self._n_alive += 1
+            self.snapshot_name = name
+        print(f"Job embeddings published as {name} ({len(ids)} rows)")
+        return name
+
+    def maybe_publish(self):
+        """publish() when there are unpublished rows and the flush interval has passed."""
+        if (self.store is not None and self._dirty
+                and time.monotonic() - self._published_at >= EMBEDDING_STORE_FLUSH_SECONDS):
+            self.publish()
+
+    def refresh(self):
+        """Re-map onto a snapshot another worker published."""
+        if self.store is None:
+            return
+        current = self.store.current()
+        if current is not None and current != self.snapshot_name:
+            self.build()
+
+    def watch_store(self, interval=EMBEDDING_STORE_FLUSH_SECONDS):
+        """
+        On a daemon thread: publish rows left unpublished because they arrived
+        inside the flush interval, then poll for newer snapshots. The ingest
+        dedup index is reloaded on the same tick.
+        """
+        def loop(stop):
+            while not stop.wait(interval):
+                try:
+                    self.maybe_publish()
+                    self.refresh()
+                except Exception as e:
+                    print("Job index refresh failed:", e)
+                try:
+                    reload_dedup_index()
+                except Exception as e:
+                    print("Dedup index reload failed:", e)
+
+        stop = threading.Event()
+        threading.Thread(target=loop, args=(stop,), name="job-index-store", daemon=True).start()
+        return stop
+
+    # ── Reading ──────────────────────────────────────────────────────────────
+    def _shared_version(self):
+        # Called under the lock. Before anything is published there is
+        # nothing to share, so the per-process counter stands in.
+        return self.snapshot_name or f"db-{self.version}"
+
+    @property
+    def corpus_version(self):
+        """
+        Identifies the indexed corpus across worker processes: the name of
+        the published snapshot, which every worker maps. Rows ingested since
+        are left out, so the value (and ETags or cursors built on it) only
+        moves when a snapshot is published, at most EMBEDDING_STORE_FLUSH_SECONDS
+        after a change. `version` is a per-process change counter.
+        """
+        with self._lock:
+            return self._shared_version()
+
+    def snapshot(self):
+        """
+        Consistent view of the first `n` rows. Appends never touch rows that
+        are already visible and the sparse matrices are rebuilt rather than
+        mutated, so readers can score outside the lock. Vectors come as
+        blocks (mapped snapshot, in-process rows); see vector_scores().
+        """
+        with self._lock:
+            n = self._size
+            if self._matrices is None or self._matrices[0] != n:
+                n_skills = len(self.vocab)
+                self._matrices = (
+                    n,
+                    skill_matrix(self._skill_ids[:n], n_skills),
+                    skill_matrix(self._extracted_ids[:n], n_skills),
+                )
+            _, (skills, skill_counts), (extracted, extracted_counts) = self._matrices
+            n_base = min(len(self._base), n)
+            return {
+                "ids": self._ids[:n],
+                "vector_blocks": (self._base[:n_base], self._vectors[:n - n_base]),
+                "exp": self._exp[:n],
+                "dates": self._dates[:n],
+                # None when every row is live; otherwise mask out archived rows
+                "alive": None if self._n_alive == n else self._alive[:n].copy(),
+                "n_alive": self._n_alive,
+                "skills": skills,
+                "skill_counts": skill_counts,
+                "extracted": extracted,
+                "extracted_counts": extracted_counts,
+                "version": self._shared_version(),
+            }
+
+    def stats(self):
+        return {
+            "corpus_version": self.corpus_version,
+            "jobs": self._n_alive,
+            "skills": len(self.vocab),
+            "built_at": self.built_at.isoformat() if self.built_at else None,
+            "build_seconds": round(self.build_seconds, 3) if self.build_seconds is not None else None,
+            "snapshot": self.snapshot_name,
+            "mapped_rows": len(self._base),
+        }
+
+
+def _row_chunks(block):
+    # numpy would upcast a whole float16 block to match a float32 query, and
+    # float16 matmul has no BLAS path, so widen it a bounded chunk at a time
+    if block.dtype == np.float32:
+        yield block
+        return
+    for start in range(0, len(block), _SCORE_CHUNK):
+        yield block[start:start + _SCORE_CHUNK].astype(np.float32)
+
+
+def vector_scores(corpus, query):
+    """
+    Dot products of the snapshot's job vectors with one query vector (n,) or
+    a block of query vectors (users, n), scored block by block so the mapped
+    matrix is never copied as a whole.
+    """
+    query = np.asarray(query, dtype=np.float32)
+    chunks = (chunk for block in corpus["vector_blocks"] if len(block) for chunk in _row_chunks(block))
+    if query.ndim == 1:
+        parts = [chunk @ query for chunk in chunks]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+    parts = [query @ chunk.T for chunk in chunks]
+    return np.hstack(parts) if parts else np.zeros((len(query), 0), dtype=np.float32)
+
+
+def top_k_indices(scores, k=None):
+    """Indices of the k highest scores, best first (argpartition, not a full sort)."""
+    n = scores.shape[0]
+    if k is None or k >= n:
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+job_index = JobIndex(EMBEDDING_DIM, store=embedding_store)
+
+
+def get_job_index():
+    """Return the resident index, building it on first use if startup did not."""
+    if not job_index.is_built:
+        job_index.build()
+    return job_index
@@ -0,0 +1,112 @@
+# jobs/ingest.py
+"""
+Writes scraped jobs into jobs_scraped.
+
+Each job is keyed by its normalized link and upserted, so scraping the same
+query twice refreshes rows instead of duplicating them. A repost of a job we
+already hold (new link; same title, company and location; near-identical
+SimHash, see jobs.dedup) is folded into the existing
+row, which only gets its date_scraped refreshed. Match features are
+computed afterwards by jobs.feature_queue.
+"""
+import os
+from datetime import date
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from models import JobScraped
+from .lifecycle import parse_posted_date
+from .dedup import SimHashIndex, get_dedup_index, identity_key, near_dup_distance, normalize_link, simhash
+from .feature_queue import feature_queue
+
+INGEST_CHUNK = int(os.getenv("INGEST_CHUNK", "1000"))  # rows per INSERT statement
+
+# Columns refreshed when a link we already have is scraped again
+_UPSERT_COLUMNS = ("title", "company", "location", "preview_desc", "full_desc", "skills", "date_posted", "date_scraped", "simhash")
+
+
+def job_row(job):
+    """Column values for one scraped job dict."""
+    skills = job.get("skills")
+    return {
+        "title": job.get("title"),
+        "company": job.get("company"),
+        "location": job.get("location"),
+        "link": normalize_link(job.get("link")),
+        "preview_desc": job.get("preview_desc"),
+        "full_desc": job.get("full_desc"),
+        "date_posted": parse_posted_date(job.get("date_posted")),
+        "skills": skills if isinstance(skills, list) else [skills],
+        "date_scraped": date.today(),
+        "simhash": simhash(
+            job.get("title"), job.get("company"), job.get("location"), job.get("full_desc") or job.get("preview_desc")
+        ),
+    }
+
+
+def store_jobs(db, jobs):
+    """
+    Bulk-upsert scraped jobs: one INSERT ... ON CONFLICT (link) DO UPDATE per
+    INGEST_CHUNK rows, reposts folded into their canonical job with a single
+    UPDATE, then commit and queue match-feature precomputation for the
+    written rows. Jobs without an absolute link are skipped. Returns the ids
+    of the inserted or updated jobs.
+    """
+    dedup_index = get_dedup_index()
+    batch_index = SimHashIndex()  # near-duplicates inside this batch
+
+    rows, unkeyed = {}, 0
+    for job in jobs:
+        row = job_row(job)
+        if row["link"] is None:
+            unkeyed += 1
+            continue
+        rows[row["link"]] = row  # last copy of a link wins
+    if unkeyed:
+        print(f"Skipped {unkeyed} scraped jobs without an absolute link")
+
+    to_write, canonical_of = [], {}
+    for row in rows.values():
+        key = identity_key(row["title"], row["company"], row["location"])
+        distance = near_dup_distance(row["full_desc"] or row["preview_desc"])
+        if batch_index.find(row["simhash"], distance, key) is not None:
+            continue
+        batch_index.add(len(to_write), row["simhash"], key)
+        canonical = dedup_index.find(row["simhash"], distance, key)
+        if canonical is not None:
+            canonical_of[len(to_write)] = canonical
+        to_write.append(row)
+
+    # Reposted ads (new link, near-identical text) only mark the canonical job as still live
+    reposted = set()
+    if canonical_of:
+        canonical_links = dict(
+            db.query(JobScraped.id, JobScraped.link).filter(JobScraped.id.in_(set(canonical_of.values())))
+        )
+        for pos, canonical in canonical_of.items():
+            if canonical in canonical_links and canonical_links[canonical] != to_write[pos]["link"]:
+                reposted.add(pos)
+    if reposted:
+        db.query(JobScraped).filter(
+            JobScraped.id.in_({canonical_of[pos] for pos in reposted})
+        ).update({"date_scraped": date.today()}, synchronize_session=False)
+
+    to_write = [row for pos, row in enumerate(to_write) if pos not in reposted]
+    stored = []
+    for start in range(0, len(to_write), INGEST_CHUNK):
+        stmt = pg_insert(JobScraped).values(to_write[start:start + INGEST_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[JobScraped.link],
+            set_={col: stmt.excluded[col] for col in _UPSERT_COLUMNS},
+        ).returning(JobScraped.id, JobScraped.simhash, JobScraped.title, JobScraped.company, JobScraped.location)
+        stored.extend(db.execute(stmt).all())
+    db.commit()
+
+    for job_id, value, title, company, location in stored:
+        dedup_index.remove(job_id)
+        dedup_index.add(job_id, value, identity_key(title, company, location))
+
+    # Match features are computed once, off the request path, instead of on every /jobs/match
+    job_ids = [job_id for job_id, *_ in stored]
+    feature_queue.enqueue(job_ids)
+    return job_ids
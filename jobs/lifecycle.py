@@ -0,0 +1,142 @@
+# jobs/lifecycle.py
+"""
+Job freshness: postings seen within JOB_FRESHNESS_DAYS (by the later of
+date_posted and date_scraped) are "hot" and live in jobs_scraped and the match
+index. Older postings are moved to jobs_archived by a periodic sweep, so the
+hot table, the index and every match scan track live postings only. Every
+worker runs the sweeper thread, but a sweep holds a Postgres advisory lock
+and moves its rows in one transaction, so concurrent sweeps never race.
+"""
+import os
+import threading
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from database import SessionLocal, advisory_lock
+from models import JobArchived, JobScraped
+
+JOB_FRESHNESS_DAYS = int(os.getenv("JOB_FRESHNESS_DAYS", "45"))
+LIFECYCLE_SWEEP_HOURS = float(os.getenv("LIFECYCLE_SWEEP_HOURS", "6"))
+
+# Columns copied verbatim into the archive
+_ARCHIVED_COLUMNS = (
+    "id", "title", "company", "location", "link", "preview_desc", "full_desc",
+    "skills", "date_posted", "date_scraped", "extracted_skills", "embedding",
+    "exp_score", "simhash",
+)
+
+_POSTED_FORMATS = ("%Y-%m-%d", "%b %d, %Y", "%B %d, %Y", "%d %b %Y", "%d %B %Y", "%d-%m-%Y", "%d/%m/%Y")
+
+
+def parse_posted_date(value):
+    """Scraped "date posted" text -> date, or None when it cannot be read."""
+    if value is None or isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for fmt in _POSTED_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def freshness_cutoff(today=None):
+    return (today or date.today()) - timedelta(days=JOB_FRESHNESS_DAYS)
+
+
+def last_seen():
+    """SQL expression for the freshness date of a job (NULL when never dated)."""
+    return func.greatest(JobScraped.date_posted, JobScraped.date_scraped)
+
+
+def hot_jobs_filter(today=None):
+    """Filter clause for live jobs; undated legacy rows count as live."""
+    seen = last_seen()
+    return or_(seen.is_(None), seen >= freshness_cutoff(today))
+
+
+def archive_stale_jobs(db, today=None):
+    """
+    Move jobs last seen before the cutoff into jobs_archived. Undated rows get
+    today's date_scraped so their clock starts now. Returns the moved ids.
+    Everything happens in one transaction: on any error nothing is moved.
+    """
+    try:
+        db.query(JobScraped).filter(
+            JobScraped.date_posted.is_(None), JobScraped.date_scraped.is_(None)
+        ).update({"date_scraped": today or date.today()}, synchronize_session=False)
+
+        # Row locks keep a concurrent refresh of date_scraped (crawler, ingest)
+        # from landing between the copy and the delete; rows it holds are
+        # skipped and looked at again next sweep
+        stale_ids = [
+            job_id for (job_id,) in
+            db.query(JobScraped.id)
+            .filter(last_seen() < freshness_cutoff(today))
+            .with_for_update(skip_locked=True)
+        ]
+
+        columns = [getattr(JobScraped, col) for col in _ARCHIVED_COLUMNS]
+        for start in range(0, len(stale_ids), 1000):
+            chunk = stale_ids[start:start + 1000]
+            # A row left in the archive by an interrupted older sweep is kept
+            db.execute(
+                pg_insert(JobArchived).from_select(
+                    list(_ARCHIVED_COLUMNS),
+                    select(*columns).where(JobScraped.id.in_(chunk)),
+                ).on_conflict_do_nothing(index_elements=[JobArchived.id])
+            )
+            db.query(JobScraped).filter(JobScraped.id.in_(chunk)).delete(synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return stale_ids
+
+
+def run_sweep():
+    """
+    Archive stale jobs and drop them from the in-process indexes. Skipped
+    (returns None) while another process is sweeping; the other workers'
+    indexes follow the snapshot the sweeping worker publishes.
+    """
+    from .dedup import get_dedup_index
+    from .index import job_index
+
+    with advisory_lock("jobs.lifecycle") as acquired:
+        if not acquired:
+            print("Job lifecycle sweep already running in another process; skipped")
+            return None
+        db = SessionLocal()
+        try:
+            archived = archive_stale_jobs(db)
+        finally:
+            db.close()
+
+    if archived:
+        dedup_index = get_dedup_index()
+        for job_id in archived:
+            dedup_index.remove(job_id)
+        # Rebuild from the table so the published embedding snapshot drops them too
+        job_index.build(from_store=False)
+    print(f"Job lifecycle sweep: archived {len(archived)} stale jobs")
+    return archived
+
+
+def start_sweeper():
+    """Run the sweep now and then every LIFECYCLE_SWEEP_HOURS on a daemon thread."""
+    def loop(stop):
+        while True:
+            try:
+                run_sweep()
+            except Exception as e:
+                print("Job lifecycle sweep failed:", e)
+            if stop.wait(LIFECYCLE_SWEEP_HOURS * 3600):
+                return
+
+    stop = threading.Event()
+    threading.Thread(target=loop, args=(stop,), name="job-lifecycle", daemon=True).start()
+    return stop
@@ -0,0 +1,70 @@
+# jobs/match_cache.py
+"""
+/jobs/match result cache.
+
+A result is fully determined by (profile content hash, job corpus version,
+scoring/paging parameters), so that tuple is both the cache key and the ETag.
+The corpus version is JobIndex.corpus_version, the published embedding
+snapshot every worker maps, so a tag issued by one worker is honoured by the
+others; jobs ingested since the last publish show up once the next snapshot
+is published.
+Clients that send the ETag back in If-None-Match get a 304 without the job
+being scored again. Entries are evicted LRU-first and expire after a TTL.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+MATCH_CACHE_SIZE = int(os.getenv("MATCH_CACHE_SIZE", "2000"))
+MATCH_CACHE_TTL = float(os.getenv("MATCH_CACHE_TTL", "900"))  # seconds
+
+
+def match_etag(profile_hash, corpus_version, params):
+    raw = json.dumps([profile_hash, corpus_version, params], sort_keys=True, default=str)
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match may carry several (possibly weak) tags or "*"."""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or ("W/" + etag) in tags
+
+
+class MatchCache:
+    def __init__(self, max_size=MATCH_CACHE_SIZE, ttl=MATCH_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # etag -> (expires_at, body)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag):
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[etag]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(etag)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, etag, body):
+        with self._lock:
+            self._entries[etag] = (time.monotonic() + self.ttl, body)
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+match_cache = MatchCache()
@@ -1,31 +1,230 @@
-
 # jobs/matcher.py
-from huggingface_hub import snapshot_download
-import spacy
+import numpy as np
+import os
 import re
 
-# --- Load model for extracting skills ---
-model_path = snapshot_download("amjad-awad/skill-extractor", repo_type="model")
-nlp = spacy.load(model_path)
+from embedding_backend import load_sentence_encoder
+from embedding_cache import cached_encode
+from model_registry import registry
+from .gazetteer import get_gazetteer
 
-def extract_skills(text):
-    doc = nlp(text)
+# --- Embedding model (job vectors are cached in JobScraped.embedding) ---
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384  # output size of EMBEDDING_MODEL, checked when it loads
+# Share of the match score given to embedding similarity (0 to 0.2, see
+# SCORE_WEIGHTS). At 0, profiles are not encoded at all.
+MATCH_SEMANTIC_WEIGHT = min(max(float(os.getenv("MATCH_SEMANTIC_WEIGHT", "0")), 0.0), 0.2)
+
+
+def _load_embedder():
+    # PyTorch or int8 ONNX Runtime, per EMBEDDING_BACKEND
+    model = load_sentence_encoder(EMBEDDING_MODEL)
+    dim = model.get_sentence_embedding_dimension()
+    if dim != EMBEDDING_DIM:
+        raise ValueError(f"{EMBEDDING_MODEL} produces {dim}-d vectors, expected {EMBEDDING_DIM}")
+    return model
+
+
+registry.register(
+    "jobs.embedder",
+    _load_embedder,
+    warmup=lambda model: model.encode(["python developer"], normalize_embeddings=True),
+    # Every /jobs/match encodes the profile when the semantic term is on;
+    # otherwise only background job precompute needs it
+    eager=MATCH_SEMANTIC_WEIGHT > 0,
+)
+
+
+def get_embedder():
+    return registry.get("jobs.embedder")
+
+
+# --- Skill extraction ---
+# "gazetteer" (dictionary scan, default), "ner" (spaCy model) or "both" (union)
+SKILL_EXTRACTOR = os.getenv("SKILL_EXTRACTOR", "gazetteer")
+
+# nlp.pipe settings; n_process > 1 forks spaCy workers, worth it for large batches only
+SKILL_BATCH_SIZE = int(os.getenv("SKILL_BATCH_SIZE", "64"))
+SKILL_N_PROCESS = int(os.getenv("SKILL_N_PROCESS", "1"))
+
+# Only the NER component (and the shared embedding layer it listens to) runs
+_NER_PIPES = {"ner", "tok2vec", "transformer"}
+
+
+def _load_nlp():
+    import spacy
+    from huggingface_hub import snapshot_download
+    model_path = snapshot_download("amjad-awad/skill-extractor", repo_type="model")
+    return spacy.load(model_path)
+
+
+registry.register(
+    "jobs.skill_ner",
+    _load_nlp,
+    warmup=lambda nlp: nlp("Experience with Python, Django and PostgreSQL"),
+    eager=SKILL_EXTRACTOR != "gazetteer",
+)
+
+
+def get_nlp():
+    """spaCy skill NER model, downloaded and loaded on first use."""
+    return registry.get("jobs.skill_ner")
+
+
+def _skills_from_doc(doc):
     return list({ent.text.lower() for ent in doc.ents if "SKILLS" in ent.label_})
 
-def infer_experience_level(text):
-    exp_levels = {
-        "intern": 0.2,
-        "junior": 0.5,
-        "associate": 0.6,
-        "mid": 0.7,
-        "senior": 0.9,
-        "lead": 1.0
+
+def ner_skills_batch(texts, batch_size=None, n_process=None):
+    """
+    Extract skills from many texts with one nlp.pipe pass.
+    Returns one skill list per input text, in order; empty texts give [].
+    """
+    batch_size = batch_size or SKILL_BATCH_SIZE
+    n_process = n_process or SKILL_N_PROCESS
+
+    results = [[] for _ in texts]
+    todo = [(i, text) for i, text in enumerate(texts) if text and text.strip()]
+    if not todo:
+        return results
+
+    # Forking workers for a handful of documents costs more than it saves
+    if len(todo) <= batch_size:
+        n_process = 1
+
+    nlp = get_nlp()
+    docs = nlp.pipe(
+        (text for _, text in todo),
+        batch_size=batch_size,
+        n_process=n_process,
+        disable=[name for name in nlp.pipe_names if name not in _NER_PIPES],
+    )
+    for (i, _), doc in zip(todo, docs):
+        results[i] = _skills_from_doc(doc)
+    return results
+
+
+def extract_skills_batch(texts, batch_size=None, n_process=None, extractor=None):
+    """
+    Canonical skills for each text, in order. Uses the skill gazetteer, the
+    NER model or both depending on SKILL_EXTRACTOR (or `extractor`).
+    """
+    extractor = extractor or SKILL_EXTRACTOR
+    gazetteer = get_gazetteer()
+
+    if extractor == "ner":
+        results = [[] for _ in texts]
+    else:
+        results = [gazetteer.extract(text) for text in texts]
+
+    if extractor in ("ner", "both"):
+        ner_results = ner_skills_batch(texts, batch_size, n_process)
+        for skills, ner_skills in zip(results, ner_results):
+            seen = set(skills)
+            for skill in map(gazetteer.normalize, ner_skills):
+                if skill and skill not in seen:
+                    seen.add(skill)
+                    skills.append(skill)
+    return results
+
+
+def normalize_skills(skills):
+    """Explicit skill labels -> canonical lowercase skills (synonyms folded)."""
+    gazetteer = get_gazetteer()
+    return {gazetteer.normalize(str(s)) for s in (skills or []) if s} - {""}
+
+
+def extract_skills(text):
+    return extract_skills_batch([text])[0]
+
+# --- Experience level ---
+# Keyword -> level; when several keywords hit, the earlier entry wins
+EXPERIENCE_LEVELS = {
+    "intern": 0.2,
+    "junior": 0.5,
+    "associate": 0.6,
+    "mid": 0.7,
+    "senior": 0.9,
+    "lead": 1.0
+}
+DEFAULT_EXPERIENCE = 0.7  # assume mid if unspecified
+
+# "3+ years", "2-4 yrs", "5 plus years"
+_YEARS = r"(?P<{}>\d{{1,2}})\s*(?:\+|plus)?\s*(?:(?:-|to|–)\s*\d{{1,2}}\s*\+?\s*)?(?:years?|yrs?)\b"
+# A years phrase counts only when it is worded as a requirement: "minimum 3
+# years", "3 years of (relevant Python) experience", "Experience: 2-4 yrs", or
+# a bare "3+ years". "Experience with 2 years warranty" or "a 50 years old
+# company" are not requirements.
+_EXPERIENCE_RE = re.compile(
+    r"\b(?P<level>" + "|".join(EXPERIENCE_LEVELS) + r")\b"
+    r"|\b(?:minimum|min\.?|at\s+least)\s*(?:of\s+)?:?\s*" + _YEARS.format("years_after_min") +
+    r"|\b" + _YEARS.format("years_before_exp") + r"(?=(?:\s+[\w+#./-]+){0,3}?\s+(?:experience|exp)\b)"
+    r"|\b(?:experience|exp)\b\s*(?:required|needed)?\s*[:\-–]\s*" + _YEARS.format("years_after_exp") +
+    r"|\b(?P<years_plus>\d{1,2})\s*(?:\+|plus)\s*(?:years?|yrs?)\b"
+)
+_YEAR_GROUPS = ("years_after_min", "years_before_exp", "years_after_exp", "years_plus")
+MAX_REQUIRED_YEARS = 20  # larger numbers are company ages, not requirements
+
+# Title keywords are the strongest signal, body keywords the weakest
+_EXPERIENCE_WEIGHTS = {"title": 0.6, "years": 0.25, "body": 0.15}
+
+
+def _years_to_level(years):
+    if years < 2:
+        return EXPERIENCE_LEVELS["junior"]
+    if years < 5:
+        return EXPERIENCE_LEVELS["mid"]
+    if years < 8:
+        return EXPERIENCE_LEVELS["senior"]
+    return EXPERIENCE_LEVELS["lead"]
+
+
+def _scan_experience(text):
+    """
+    (keyword level or None, minimum years required or None) for one text.
+
+    >>> _scan_experience("3+ years")
+    (None, 3)
+    >>> _scan_experience("Experience with 2 years warranty")
+    (None, None)
+    >>> _scan_experience("Minimum 4 years; Experience: 2-4 yrs")
+    (None, 2)
+    >>> _scan_experience("Senior engineer, 5 years of Python experience")
+    (0.9, 5)
+    """
+    levels, years = set(), []
+    for m in _EXPERIENCE_RE.finditer((text or "").lower()):
+        if m.group("level"):
+            levels.add(m.group("level"))
+            continue
+        value = int(next(m.group(g) for g in _YEAR_GROUPS if m.group(g) is not None))
+        if value <= MAX_REQUIRED_YEARS:
+            years.append(value)
+    level = next((EXPERIENCE_LEVELS[k] for k in EXPERIENCE_LEVELS if k in levels), None)
+    return level, (min(years) if years else None)
+
+
+def infer_experience_level(text, title=None):
+    """
+    Experience level in [0.2, 1.0] from a title and/or body text: a weighted
+    blend of the title keyword, the years-of-experience phrase and the body
+    keyword, over whichever signals are present.
+    """
+    title_level, title_years = _scan_experience(title)
+    body_level, body_years = _scan_experience(text)
+    years = title_years if title_years is not None else body_years
+
+    signals = {
+        "title": title_level,
+        "years": _years_to_level(years) if years is not None else None,
+        "body": body_level,
     }
-    text = text.lower()
-    for keyword, value in exp_levels.items():
-        if re.search(rf"\b{keyword}\b", text):
-            return value
-    return 0.7  # assume mid if unspecified
+    present = {k: v for k, v in signals.items() if v is not None}
+    if not present:
+        return DEFAULT_EXPERIENCE
+
+    total = sum(_EXPERIENCE_WEIGHTS[k] for k in present)
+    return round(sum(_EXPERIENCE_WEIGHTS[k] * v for k, v in present.items()) / total, 3)
 
 def clean_skill(skill):
     """
@@ -34,62 +233,165 @@ def clean_skill(skill):
     return skill.strip().strip('"').lower()
 
 
-def match_jobs(user, jobs):
-    user_skills = set(skill.lower() for skill in user.get("skills", []))
-    user_projects_text = " ".join(
-        " ".join(p.get("desc", [])) if isinstance(p, dict) else str(p)
-        for p in user.get("projects", [])
+def serialize_vec(vec):
+    """float32 ndarray -> bytes for DB storage."""
+    return np.asarray(vec, dtype="float32").tobytes()
+
+
+def deserialize_vec(data):
+    """bytes -> float32 ndarray."""
+    return np.frombuffer(data, dtype="float32")
+
+
+def job_embedding_text(title, description, skills):
+    return f"{title or ''} {description or ''} Skills: {', '.join(map(str, skills or []))}"
+
+
+# --- Ingest: called once when a job is stored ---
+def precompute_jobs(job_orms, db=None):
+    """
+    Compute and persist extracted_skills, exp_score and embedding for a batch
+    of JobScraped rows so match_jobs never has to look at the text again.
+    Skills go through one nlp.pipe pass and embeddings through one encode call.
+    Commits only when a session is passed; ingest callers commit in bulk.
+    """
+    job_orms = list(job_orms)
+    if not job_orms:
+        return
+
+    descriptions = [job.full_desc or job.preview_desc or "" for job in job_orms]
+    skills = extract_skills_batch(descriptions)
+    # Reposted or re-scraped descriptions come out of the embedding cache
+    vecs = cached_encode(
+        EMBEDDING_MODEL,
+        get_embedder,
+        [job_embedding_text(job.title, desc, job.skills) for job, desc in zip(job_orms, descriptions)],
+        batch_size=SKILL_BATCH_SIZE,
     )
-    user_extracted = set(extract_skills(user_projects_text))
-    user_exp = infer_experience_level(user_projects_text)
 
-    matched_jobs = []
+    for job, desc, job_skills, vec in zip(job_orms, descriptions, skills, vecs):
+        job.extracted_skills = job_skills
+        job.exp_score = infer_experience_level(desc, title=job.title)
+        job.embedding = serialize_vec(vec)
 
-    for job in jobs:
-        job_skills = set(skill.lower() for skill in (job.get("skills") or []))
-        job_extracted = set(extract_skills(job.get("description") or ""))
-        job_exp = infer_experience_level(job.get("description") or "")
+    if db is not None:
+        db.commit()
 
-        explicit_skill_match = (
-            len(user_skills & job_skills) / len(job_skills) if job_skills else 0
-        )
 
-        extracted_skill_match = (
-            len(user_extracted & job_extracted) / len(job_extracted)
-            if job_extracted
-            else 0
-        )
+def precompute_job(job_orm, db=None):
+    precompute_jobs([job_orm], db)
+
 
-        exp_match = 1 - abs(user_exp - job_exp)
+# --- Match: scores a profile against the resident job index ---
+# The original 0.7 / 0.2 / 0.1 blend of explicit skills, extracted skills and
+# experience. MATCH_SEMANTIC_WEIGHT (default 0) moves that much of the
+# extracted-skills weight onto embedding similarity.
+SCORE_WEIGHTS = {
+    "explicit": 0.7,
+    "extracted": 0.2 - MATCH_SEMANTIC_WEIGHT,
+    "semantic": MATCH_SEMANTIC_WEIGHT,
+    "experience": 0.1,
+}
 
-        final_score = (
-            0.7 * explicit_skill_match
-            + 0.2 * extracted_skill_match
-            + 0.1 * exp_match
+
+def _user_texts(user):
+    """(projects text, full profile text) used for extraction and embedding."""
+    projects_text = []
+    for p in user.get("projects", []):
+        if isinstance(p, dict):
+            desc = p.get("desc", [])
+            projects_text.extend(map(str, desc) if isinstance(desc, list) else [str(desc)])
+        else:
+            projects_text.append(str(p))
+    user_projects_text = " ".join(projects_text)
+
+    user_text = (
+        "Skills: " + ", ".join(map(str, user.get("skills", []))) +
+        ". Projects: " + user_projects_text
+    )
+    return user_projects_text, user_text
+
+
+def user_features_batch(users):
+    """
+    Skill sets, experience level and embedding for many profiles, with one
+    skill-extraction pass and one encode call for the whole batch. The
+    embedding is None when the semantic term is off (MATCH_SEMANTIC_WEIGHT=0).
+    """
+    texts = [_user_texts(user) for user in users]
+    extracted = extract_skills_batch([projects_text for projects_text, _ in texts])
+    if SCORE_WEIGHTS["semantic"]:
+        vecs = cached_encode(
+            EMBEDDING_MODEL,
+            get_embedder,
+            [user_text for _, user_text in texts],
+            batch_size=SKILL_BATCH_SIZE,
         )
+    else:
+        vecs = [None] * len(users)
+    return [
+        {
+            "skills": normalize_skills(user.get("skills", [])),
+            "extracted": set(user_extracted),
+            "exp": infer_experience_level(projects_text),
+            "embedding": np.asarray(vec, dtype="float32") if vec is not None else None,
+        }
+        for user, (projects_text, _), user_extracted, vec in zip(users, texts, extracted, vecs)
+    ]
+
+
+def user_features(user):
+    """Skill sets, experience level and embedding for one profile."""
+    return user_features_batch([user])[0]
+
+
+def match_jobs(user, index, top_k=None, features=None, sort_by="score"):
+    """
+    Score a profile against every job in `index` (a jobs.index.JobIndex).
+    Returns [(job_id, score)] best first, or with sort_by="date" newest
+    posting first (best score first within a day) across every live job.
+    Only cached job features are read. Pass `features` (see
+    jobs.profile_cache) to skip recomputing the profile side.
+    """
+    from .index import overlap_ratio, top_k_indices, vector_scores
+
+    if features is None:
+        features = user_features(user)
+    corpus = index.snapshot()
+    n = len(corpus["ids"])
+    if n == 0:
+        return []
+
+    # Overlap ratios read only the postings (CSC columns) of the user's skills;
+    # jobs sharing no skill keep zero and rank on the semantic/experience terms
+    explicit = overlap_ratio(
+        corpus["skills"], corpus["skill_counts"], index.vocab.lookup(features["skills"])
+    )
+    extracted = overlap_ratio(
+        corpus["extracted"], corpus["extracted_counts"], index.vocab.lookup(features["extracted"])
+    )
+
+    exp_match = 1 - np.abs(features["exp"] - corpus["exp"])
+
+    scores = (
+        SCORE_WEIGHTS["explicit"] * explicit
+        + SCORE_WEIGHTS["extracted"] * extracted
+        + SCORE_WEIGHTS["experience"] * exp_match
+    )
+    if SCORE_WEIGHTS["semantic"]:
+        scores += SCORE_WEIGHTS["semantic"] * np.clip(vector_scores(corpus, features["embedding"]), 0.0, 1.0)
+
+    if sort_by == "date":
+        order = np.lexsort((-scores, -corpus["dates"]))  # undated (0) sort last
+        if corpus["alive"] is not None:
+            order = order[corpus["alive"][order]]
+        order = order[:top_k]
+        return [(int(corpus["ids"][i]), round(float(scores[i]), 3)) for i in order]
+
+    if corpus["alive"] is not None:
+        # Rows archived since the embedding snapshot was published
+        scores[~corpus["alive"]] = -np.inf
+        top_k = corpus["n_alive"] if top_k is None else min(top_k, corpus["n_alive"])
 
-        # --- DEBUG LOG ---
-        print("JOB:", job.get("title"))
-        print("Job Skills:", job_skills)
-        print("User Skills:", user_skills)
-        print("Explicit Match:", explicit_skill_match)
-        print("Extracted Match:", extracted_skill_match)
-        print("Experience Match:", exp_match)
-        print("Final Score:", round(final_score, 3))
-        print("-" * 50)
-
-        matched_jobs.append({
-            "id": job.get("id"),
-            "title": job.get("title"),
-            "company": job.get("company"),
-            "location": job.get("location"),
-            "link": job.get("link"),
-            "preview_desc": job.get("preview_desc"),
-            "full_desc": job.get("description"),
-            "skills": job.get("skills") or [],
-            "date_posted": job.get("date_posted"),
-            "score": round(final_score, 3)
-        })
-
-    matched_jobs.sort(key=lambda x: x["score"], reverse=True)
-    return matched_jobs
\ No newline at end of file
+    order = top_k_indices(scores, top_k)
+    return [(int(corpus["ids"][i]), round(float(scores[i]), 3)) for i in order]
@@ -0,0 +1,243 @@
+# jobs/parsers.py
+"""
+Rozee.pk page parsing shared by the HTTP and browser scrapers.
+
+parse_listing() turns a search results page into job card dicts and
+parse_detail() pulls the full description out of a job page. Both take raw
+HTML, so the same code runs on httpx responses and on driver.page_source.
+
+The selectors are implemented once per backend: selectolax (fastest), lxml
+and BeautifulSoup. HTML_PARSER picks one; by default the fastest installed
+backend is used. scripts/bench_parsers.py compares them on saved pages.
+"""
+import os
+import re
+from datetime import date
+
+# Markers of a CAPTCHA / bot wall instead of real content
+_BLOCK_MARKERS = ("g-recaptcha", "recaptcha/api", "hcaptcha", "cf-challenge", "challenge-platform", "Just a moment...")
+
+
+def looks_blocked(html):
+    """True when a page is a CAPTCHA / JS challenge rather than content."""
+    if not html:
+        return True
+    head = html[:20000]
+    return any(marker in head for marker in _BLOCK_MARKERS)
+
+
+_RESULTS_LIST = re.compile(r"""\bid\s*=\s*["']?jobs\b""", re.IGNORECASE)
+
+
+def has_results_list(html):
+    """True when a search page was rendered server-side (its #jobs list exists), even if empty."""
+    return bool(html) and _RESULTS_LIST.search(html) is not None
+
+
+def _card(title, link, company_text, preview_desc, date_posted, skills):
+    if link and link.startswith("//"):
+        link = "https:" + link
+
+    company, location = None, None
+    if company_text:
+        parts = [p.strip() for p in company_text.split(",")]
+        company = parts[0] if len(parts) > 0 else None
+        location = ", ".join(parts[1:]) if len(parts) > 1 else None
+
+    return {
+        "title": title,
+        "company": company,
+        "location": location,
+        "link": link,
+        "preview_desc": preview_desc,
+        "full_desc": preview_desc,
+        "date_posted": date_posted,
+        "skills": skills,
+        "date_scraped": date.today().strftime("%Y-%m-%d"),
+        "source": "Rozee.pk"
+    }
+
+
+# --- Backends: each reads the raw fields of the Rozee selectors ---
+class Bs4Backend:
+    name = "bs4"
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        try:
+            import lxml  # noqa: F401
+            self.features = "lxml"
+        except ImportError:
+            self.features = "html.parser"
+        self._soup = lambda html: BeautifulSoup(html or "", self.features)
+
+    def parse_listing(self, html):
+        jobs = []
+        for job in self._soup(html).select("#jobs .job"):
+            title_tag = job.select_one("h3.s-18 a")
+            company_block = job.select_one(".cname")
+            preview_desc = job.select_one(".jbody bdi")
+            date_tag = job.select_one(".jfooter .rz-calendar")
+            date_span = date_tag.find_parent("span") if date_tag else None
+            jobs.append(_card(
+                title_tag.get_text(strip=True) if title_tag else None,
+                title_tag.get("href") if title_tag else None,
+                company_block.get_text(" ", strip=True) if company_block else None,
+                preview_desc.get_text(strip=True) if preview_desc else None,
+                date_span.get_text(strip=True) if date_span else None,
+                [s.get_text(" ", strip=True) for s in job.select(".jfooter .label")],
+            ))
+        return jobs
+
+    def parse_detail(self, html):
+        desc_container = self._soup(html).select_one("div.jblk.ul18 div[dir='ltr']")
+        if not desc_container:
+            return None
+        for br in desc_container.find_all("br"):
+            br.replace_with(" ")
+        return desc_container.get_text(" ", strip=True) or None
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _lxml_text(el, sep=""):
+    """BeautifulSoup get_text(sep, strip=True) for an lxml element."""
+    return sep.join(s.strip() for s in el.itertext() if s.strip())
+
+
+class LxmlBackend:
+    name = "lxml"
+
+    # XPath equivalents of the CSS selectors, so cssselect is not needed
+    _CARDS = f"//*[@id='jobs']//*[{_has_class('job')}]"
+    _TITLE = f".//h3[{_has_class('s-18')}]//a"
+    _COMPANY = f".//*[{_has_class('cname')}]"
+    _PREVIEW = f".//*[{_has_class('jbody')}]//bdi"
+    _CALENDAR = f".//*[{_has_class('jfooter')}]//*[{_has_class('rz-calendar')}]"
+    _SKILLS = f".//*[{_has_class('jfooter')}]//*[{_has_class('label')}]"
+    _DETAIL = f"//div[{_has_class('jblk')} and {_has_class('ul18')}]//div[@dir='ltr']"
+
+    def __init__(self):
+        import lxml.html
+        self._fromstring = lxml.html.fromstring
+
+    def _tree(self, html):
+        return self._fromstring(html) if html and html.strip() else None
+
+    def parse_listing(self, html):
+        tree = self._tree(html)
+        if tree is None:
+            return []
+        jobs = []
+        for job in tree.xpath(self._CARDS):
+            title_tag = next(iter(job.xpath(self._TITLE)), None)
+            company_block = next(iter(job.xpath(self._COMPANY)), None)
+            preview_desc = next(iter(job.xpath(self._PREVIEW)), None)
+            date_tag = next(iter(job.xpath(self._CALENDAR)), None)
+            date_span = next(date_tag.iterancestors("span"), None) if date_tag is not None else None
+            jobs.append(_card(
+                _lxml_text(title_tag) if title_tag is not None else None,
+                title_tag.get("href") if title_tag is not None else None,
+                _lxml_text(company_block, " ") if company_block is not None else None,
+                _lxml_text(preview_desc) if preview_desc is not None else None,
+                _lxml_text(date_span) if date_span is not None else None,
+                [_lxml_text(s, " ") for s in job.xpath(self._SKILLS)],
+            ))
+        return jobs
+
+    def parse_detail(self, html):
+        tree = self._tree(html)
+        desc_container = next(iter(tree.xpath(self._DETAIL)), None) if tree is not None else None
+        if desc_container is None:
+            return None
+        return _lxml_text(desc_container, " ") or None
+
+
+def _selectolax_text(node, sep=""):
+    """BeautifulSoup get_text(sep, strip=True) for a selectolax node."""
+    parts = (n.text(deep=False).strip() for n in node.traverse(include_text=True) if n.tag == "-text")
+    return sep.join(part for part in parts if part)
+
+
+class SelectolaxBackend:
+    name = "selectolax"
+
+    def __init__(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser as HTMLParser
+        except ImportError:  # selectolax < 0.3.13 only has the Modest parser
+            from selectolax.parser import HTMLParser
+        self._parser = HTMLParser
+
+    def parse_listing(self, html):
+        jobs = []
+        for job in self._parser(html or "").css("#jobs .job"):
+            title_tag = job.css_first("h3.s-18 a")
+            company_block = job.css_first(".cname")
+            preview_desc = job.css_first(".jbody bdi")
+            date_tag = job.css_first(".jfooter .rz-calendar")
+            # Nearest enclosing <span>, starting above the icon like bs4's find_parent
+            date_span = date_tag.parent if date_tag is not None else None
+            while date_span is not None and date_span.tag != "span":
+                date_span = date_span.parent
+            jobs.append(_card(
+                _selectolax_text(title_tag) if title_tag else None,
+                title_tag.attributes.get("href") if title_tag else None,
+                _selectolax_text(company_block, " ") if company_block else None,
+                _selectolax_text(preview_desc) if preview_desc else None,
+                _selectolax_text(date_span) if date_span else None,
+                [_selectolax_text(s, " ") for s in job.css(".jfooter .label")],
+            ))
+        return jobs
+
+    def parse_detail(self, html):
+        desc_container = self._parser(html or "").css_first("div.jblk.ul18 div[dir='ltr']")
+        if desc_container is None:
+            return None
+        return _selectolax_text(desc_container, " ") or None
+
+
+BACKENDS = {backend.name: backend for backend in (SelectolaxBackend, LxmlBackend, Bs4Backend)}
+HTML_PARSER = os.getenv("HTML_PARSER")  # selectolax | lxml | bs4; unset = fastest installed
+
+_instances = {}
+
+
+def get_backend(name=None):
+    """Parser backend by name, or the configured / fastest available one."""
+    name = name or HTML_PARSER
+    if name:
+        if name not in _instances:
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown HTML parser backend '{name}'; choose from {sorted(BACKENDS)}")
+            _instances[name] = BACKENDS[name]()
+        return _instances[name]
+    for candidate in BACKENDS:  # fastest first
+        try:
+            return get_backend(candidate)
+        except ImportError:
+            continue
+    raise ImportError("No HTML parser installed: need selectolax, lxml or beautifulsoup4")
+
+
+def available_backends():
+    names = []
+    for name in BACKENDS:
+        try:
+            get_backend(name)
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+
+def parse_listing(html, backend=None):
+    """Job cards on a Rozee search results page."""
+    return get_backend(backend).parse_listing(html)
+
+
+def parse_detail(html, backend=None):
+    """Full description text from a Rozee job page, or None."""
+    return get_backend(backend).parse_detail(html)
@@ -0,0 +1,56 @@
+# jobs/profile_cache.py
+"""
+Per-profile match features (normalized skills, extracted skills, experience
+level, embedding), cached so repeated /jobs/match calls skip the NER pass and
+the profile encode.
+
+Entries are keyed by user email and tagged with a hash of the profile content.
+Profile writes call invalidate_profile(); the hash check also catches writes
+made by another worker process, so a stale entry is never served.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "5000"))
+
+_cache = OrderedDict()  # email -> (content_hash, features)
+_lock = threading.Lock()
+
+
+def profile_hash(user):
+    """Stable SHA-256 over the profile fields the matcher reads."""
+    payload = json.dumps(
+        {"skills": user.get("skills") or [], "projects": user.get("projects") or []},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_profile_features(email, user):
+    """Return (features, content_hash), computing features only on a miss."""
+    from .matcher import user_features
+
+    content_hash = profile_hash(user)
+    with _lock:
+        entry = _cache.get(email)
+        if entry and entry[0] == content_hash:
+            _cache.move_to_end(email)
+            return entry[1], content_hash
+
+    features = user_features(user)
+
+    with _lock:
+        _cache[email] = (content_hash, features)
+        _cache.move_to_end(email)
+        while len(_cache) > PROFILE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return features, content_hash
+
+
+def invalidate_profile(email):
+    with _lock:
+        _cache.pop(email, None)
@@ -1,60 +1,93 @@
 from fastapi import APIRouter, Query
-from .scraper import scrape_jobs
+from .http_scraper import scrape_jobs
 from models import JobScraped
 from database import SessionLocal
 from sqlalchemy.orm import Session
-from datetime import date
 
 
-from fastapi import Depends, HTTPException, Query
+from fastapi import Depends, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 from database import get_db
 from models import JobScraped, Profile
 from .matcher import match_jobs
+from .ingest import store_jobs
+from .index import get_job_index
+from .profile_cache import get_profile_features, profile_hash
+from .match_cache import etag_matches, match_cache, match_etag
+from .scrape_cache import scrape_cache
+from .search import search_jobs_local
+from .crawler import track_query
 from urllib.parse import unquote
+from typing import Literal, Optional
+import base64
+import json
 
 
 
 router = APIRouter(prefix="/jobs", tags=["Jobs"])
 
 @router.get("/search")
-def search_jobs(query: str = Query(..., description="Job title or keywords")):
+def search_jobs(
+    query: str = Query(..., description="Job title or keywords"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    refresh: bool = Query(False, description="Scrape Rozee.pk now instead of searching stored jobs"),
+):
     db: Session = SessionLocal()
     try:
         # Decode query (e.g., "Mobile%20App%20Developer" → "Mobile App Developer")
         query = unquote(query)
+        offset = (page - 1) * page_size
+
+        def scrape_and_store():
+            jobs = scrape_jobs(query)
+            if not jobs:
+                return []
+            # Bulk upsert by normalized link and fold reposts; match features
+            # are precomputed in the background and then added to the index
+            job_ids = store_jobs(db, jobs)
+            # The crawler keeps this query fresh from now on
+            track_query(db, query)
+            return job_ids
+
+        # Searches are answered from jobs_scraped (kept fresh by the crawler);
+        # Rozee.pk is scraped only on request or when nothing is stored yet
+        rows, total = search_jobs_local(db, query, offset, page_size)
+        source = "local"
+        if refresh or (total == 0 and page == 1):
+            if refresh:
+                scrape_cache.invalidate(query)
+            # Identical concurrent refreshes share one scrape
+            job_ids, _ = scrape_cache.get_or_scrape(query, scrape_and_store)
+            source = "scrape"
+            rows, total = search_jobs_local(db, query, offset, page_size)
+            if total == 0 and page == 1 and job_ids:
+                # Listings can match the site's search without sharing a
+                # lexeme with the query; return them in scrape order
+                found = load_jobs_by_id(db, job_ids)
+                rows = [found[i] for i in job_ids if i in found]
+                total = len(rows)
+                rows = rows[:page_size]
 
-
-        jobs = scrape_jobs(query)
-
-        if not jobs:
-            return {"count": 0, "jobs": []}
-
-        for job in jobs:
-            db_job = JobScraped(
-                title=job.get("title"),
-                company=job.get("company"),
-                location=job.get("location"),
-                link=job.get("link"),
-                preview_desc=job.get("preview_desc"),
-                full_desc=job.get("full_desc"),
-                date_posted=job.get("date_posted"),
-                skills=job.get("skills") if isinstance(job.get("skills"), list) else [job.get("skills")],
-                date_scraped=date.today()
-            )
-            db.add(db_job)
-
-        db.commit()
-
-        # Ensure skills is always a list when sending to frontend
         jobs_for_frontend = []
-        for job in jobs:
-            job_copy = job.copy()
+        for job in rows:
+            job_copy = {key: value for key, value in job._mapping.items() if key not in ("rank", "total")}
+            # Ensure skills is always a list when sending to frontend
             if not isinstance(job_copy.get("skills"), list):
                 job_copy["skills"] = [job_copy["skills"]]
+            job_copy["source"] = "Rozee.pk"
             jobs_for_frontend.append(job_copy)
 
-        return {"count": len(jobs_for_frontend), "jobs": jobs_for_frontend}
+        return {
+            "count": len(jobs_for_frontend),
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "source": source,
+            "jobs": jobs_for_frontend,
+        }
 
     except Exception as e:
         db.rollback()
@@ -66,37 +99,153 @@ def search_jobs(query: str = Query(..., description="Job title or keywords")):
 
 
 
+def load_jobs_by_id(db, job_ids):
+    """Display fields for the given job ids, keyed by id."""
+    rows = {}
+    for start in range(0, len(job_ids), 5000):
+        chunk = job_ids[start:start + 5000]
+        for job in db.query(
+            JobScraped.id,
+            JobScraped.title,
+            JobScraped.company,
+            JobScraped.location,
+            JobScraped.link,
+            JobScraped.preview_desc,
+            JobScraped.full_desc,
+            JobScraped.skills,
+            JobScraped.date_posted,
+        ).filter(JobScraped.id.in_(chunk)):
+            rows[job.id] = job
+    return rows
+
+
+def format_match(job, score, include_desc=True):
+    return {
+        "id": job.id,
+        "title": job.title,
+        "company": job.company,
+        "location": job.location,
+        "link": job.link,
+        "preview_desc": job.preview_desc,
+        "full_desc": (job.full_desc or job.preview_desc or "") if include_desc else None,
+        "skills": job.skills or [],
+        "date_posted": job.date_posted,
+        "score": score
+    }
+
+
+def encode_cursor(offset, corpus_version):
+    raw = json.dumps({"o": offset, "v": corpus_version}).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return int(data["o"]), str(data["v"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def stream_matches(page, include_desc):
+    """NDJSON body: one scored job per line, sent as each chunk is loaded."""
+    db = SessionLocal()  # own session: the request-scoped one closes before streaming ends
+    try:
+        for start in range(0, len(page), 50):
+            chunk = page[start:start + 50]
+            rows = load_jobs_by_id(db, [job_id for job_id, _ in chunk])
+            for job_id, score in chunk:
+                job = rows.get(job_id)
+                if job is not None:
+                    line = jsonable_encoder(format_match(job, score, include_desc))
+                    yield json.dumps(line) + "\n"
+    finally:
+        db.close()
+
+
 @router.get("/match")
-def get_matched_jobs(email: str = Query(..., description="User email"), db: Session = Depends(get_db)):
+def get_matched_jobs(
+    request: Request,
+    email: str = Query(..., description="User email"),
+    top_k: int = Query(50, ge=1, le=1000, description="Number of jobs to return"),
+    offset: int = Query(0, ge=0, description="Number of ranked jobs to skip"),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page"),
+    sort_by: Literal["score", "date"] = Query("score", description="score (best match first) or date (newest first)"),
+    include_desc: bool = Query(True, description="Include full_desc in each job"),
+    stream: bool = Query(False, description="Stream results as application/x-ndjson"),
+    db: Session = Depends(get_db)
+):
     # Fetch user profile
     profile = db.query(Profile).filter(Profile.user_email == email).first()
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    # Fetch all scraped jobs
-    jobs_orm = db.query(JobScraped).all()
-    if not jobs_orm:
-        return {"count": 0, "jobs": []}
-
-    # Convert ORM objects to dicts for matcher
-    jobs = []
-    for job in jobs_orm:
-        jobs.append({
-            "title": job.title,
-            "company": job.company,
-            "location": job.location,
-            "link": job.link,
-            "preview_desc": job.preview_desc,
-            "description": job.full_desc or job.preview_desc or "",
-            "skills": job.skills or [],
-            "date_posted": job.date_posted
-        })
+    index = get_job_index()
+    # Shared by every worker holding the same corpus, so a cursor or ETag
+    # issued here stays valid when the next request lands on another worker
+    corpus_version = index.corpus_version
 
+    if cursor:
+        offset, cursor_version = decode_cursor(cursor)
+        if cursor_version != corpus_version:
+            # The cursor may come from a worker that already mapped a newer snapshot
+            index.refresh()
+            corpus_version = index.corpus_version
+        if cursor_version != corpus_version:
+            raise HTTPException(status_code=409, detail="Job corpus changed; restart pagination")
 
     user_data = {
         "skills": profile.skills or [],
         "projects": profile.projects or []
     }
 
-    matched = match_jobs(user_data, jobs)
-    return {"count": len(matched), "jobs": matched}
+    # Same profile content + corpus version + parameters => same result
+    etag = match_etag(
+        profile_hash(user_data), corpus_version,
+        [top_k, offset, sort_by, include_desc]
+    )
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers)
+
+    wants_stream = stream or "application/x-ndjson" in request.headers.get("accept", "")
+    if not wants_stream:
+        cached = match_cache.get(etag)
+        if cached is not None:
+            return JSONResponse(content=cached, headers=cache_headers)
+
+    features, _ = get_profile_features(email, user_data)
+    ranked = match_jobs(user_data, index, top_k=offset + top_k, features=features, sort_by=sort_by)
+    page = ranked[offset:offset + top_k]
+
+    total = len(index)
+    next_offset = offset + len(page)
+    next_cursor = encode_cursor(next_offset, corpus_version) if next_offset < total else None
+
+    if wants_stream:
+        headers = {**cache_headers, "X-Corpus-Version": str(corpus_version), "X-Total-Count": str(total)}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return StreamingResponse(
+            stream_matches(page, include_desc),
+            media_type="application/x-ndjson",
+            headers=headers
+        )
+
+    rows = load_jobs_by_id(db, [job_id for job_id, _ in page])
+    matched = [
+        format_match(rows[job_id], score, include_desc)
+        for job_id, score in page
+        if job_id in rows
+    ]
+
+    body = jsonable_encoder({
+        "count": len(matched),
+        "total": total,
+        "offset": offset,
+        "next_cursor": next_cursor,
+        "jobs": matched,
+        "index": index.stats()
+    })
+    match_cache.put(etag, body)
+    return JSONResponse(content=body, headers=cache_headers)
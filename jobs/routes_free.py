@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 from database import get_db
 from models import JobScraped, Profile
 from .matcher import match_jobs
+from .index import get_job_index
 
 
 
@@ -68,30 +69,32 @@ def get_matched_jobs(email: str = Query(..., description="User email"), db: Sess
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    # Fetch all scraped jobs
-    jobs_orm = db.query(JobScraped).all()
-    if not jobs_orm:
-        return {"count": 0, "jobs": []}
+    user_data = {
+        "skills": profile.skills or [],
+        "projects": profile.projects or []
+    }
 
-    # Convert ORM objects to dicts for matcher
-    jobs = []
-    for job in jobs_orm:
-        jobs.append({
+    # Score against the resident job index, then load the matched rows
+    ranked = match_jobs(user_data, get_job_index())
+    if not ranked:
+        return {"count": 0, "jobs": []}
+    jobs_orm = {job.id: job for job in db.query(JobScraped).filter(JobScraped.id.in_([job_id for job_id, _ in ranked]))}
+
+    matched = []
+    for job_id, score in ranked:
+        job = jobs_orm.get(job_id)
+        if job is None:
+            continue
+        matched.append({
+            "id": job.id,
             "title": job.title,
             "company": job.company,
             "location": job.location,
             "link": job.link,
             "preview_desc": job.preview_desc,
-            "description": job.full_desc or job.preview_desc or "",
+            "full_desc": job.full_desc or job.preview_desc or "",
             "skills": job.skills or [],
-            "date_posted": job.date_posted
+            "date_posted": job.date_posted,
+            "score": score
         })
-
-
-    user_data = {
-        "skills": profile.skills or [],
-        "projects": profile.projects or []
-    }
-
-    matched = match_jobs(user_data, jobs)
     return {"count": len(matched), "jobs": matched}
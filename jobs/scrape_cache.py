@@ -0,0 +1,123 @@
+# jobs/scrape_cache.py
+"""
+/jobs/search scrape cache.
+
+Scraped jobs are stored in jobs_scraped anyway, so for each normalized query
+we only remember which job ids the last scrape produced and when. Within
+SCRAPE_CACHE_TTL a repeat search is answered from the table without touching
+the site. Identical searches arriving while a scrape is running wait for that
+scrape instead of starting their own.
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+SCRAPE_CACHE_TTL = float(os.getenv("SCRAPE_CACHE_TTL", "3600"))  # seconds
+SCRAPE_CACHE_SIZE = int(os.getenv("SCRAPE_CACHE_SIZE", "1000"))
+SCRAPE_WAIT_TIMEOUT = float(os.getenv("SCRAPE_WAIT_TIMEOUT", "300"))  # followers of a running scrape
+
+
+def normalize_query(query):
+    """"  Software  Engineer" and "software engineer" share one entry."""
+    return re.sub(r"\s+", " ", (query or "").strip().lower())
+
+
+class _Flight:
+    """One running scrape that other requests for the same query wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ScrapeCache:
+    def __init__(self, max_size=SCRAPE_CACHE_SIZE, ttl=SCRAPE_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # query -> (expires_at, job ids)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, query):
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, query, job_ids):
+        key = normalize_query(query)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, list(job_ids))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, query=None):
+        with self._lock:
+            if query is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(normalize_query(query), None)
+
+    def get_or_scrape(self, query, scrape):
+        """
+        Job ids for `query` and whether they came from the cache. On a miss
+        `scrape()` runs once per query however many requests are waiting;
+        it must return the ids of the stored jobs.
+        """
+        job_ids = self.get(query)
+        if job_ids is not None:
+            self.hits += 1
+            return job_ids, True
+
+        key = normalize_query(query)
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            self.coalesced += 1
+            if not flight.done.wait(SCRAPE_WAIT_TIMEOUT):
+                raise TimeoutError(f"Timed out waiting for the running scrape of '{query}'")
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        self.misses += 1
+        try:
+            flight.result = list(scrape())
+            if flight.result:  # an empty scrape is often a block; retry next time
+                self.put(query, flight.result)
+            return flight.result, False
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+scrape_cache = ScrapeCache()
@@ -1,41 +1,47 @@
-from bs4 import BeautifulSoup
-import undetected_chromedriver as uc
-from datetime import date
-import time, urllib.parse
+import os, time, urllib.parse
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 
-# Keep headless off so you can interact with CAPTCHA
-HEADLESS = False
-# Maximum seconds to wait for the page to be ready after opening (solve captcha)
+from .browser_pool import HEADLESS, browser_pool
+from .parsers import parse_detail, parse_listing
+
+# Maximum seconds to wait for the page to be ready after opening (solve captcha
+# in a visible window: run with SCRAPER_HEADLESS=0)
 MAX_WAIT_FOR_CAPTCHA = 120  # adjust as needed
+# Headless, nobody can solve a CAPTCHA, so only wait for the page to render
+HEADLESS_PAGE_WAIT = float(os.getenv("SCRAPER_HEADLESS_WAIT", "10"))
+PAGE_READY_WAIT = HEADLESS_PAGE_WAIT if HEADLESS else MAX_WAIT_FOR_CAPTCHA
+# Detail pages opened per search; each costs a page load in the browser
+BROWSER_MAX_RESULTS = int(os.getenv("BROWSER_MAX_RESULTS", "20"))
 
 def scrape_jobs(query):
-    jobs = []
+    # Warm browser from the shared pool instead of a fresh Chrome per search
+    try:
+        with browser_pool.checkout() as browser:
+            return _scrape_rozee(browser, query)
+    except WebDriverException as e:
+        # Raised through checkout(), so the pool has discarded the browser
+        print("Browser failed while scraping Rozee:", e)
+        return []
 
-    options = uc.ChromeOptions()
-    if HEADLESS:
-        options.add_argument("--headless=new")
-        options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--window-size=1200,1000")
 
-    driver = uc.Chrome(options=options)
+def _scrape_rozee(browser, query):
+    jobs = []
+    driver = browser.driver
 
     try:
         base_url = "https://www.rozee.pk/job/jsearch/q/"
         encoded_query = urllib.parse.quote(query)
         url = base_url + encoded_query
 
-        driver.get(url)
+        browser.get(url)
 
         # === NEW: Wait for either jobs to appear (after CAPTCHA) or timeout ===
-        print(f"Opened search page for '{query}'. Waiting up to {MAX_WAIT_FOR_CAPTCHA}s for page to be ready (solve CAPTCHA if prompted)...")
+        print(f"Opened search page for '{query}'. Waiting up to {PAGE_READY_WAIT:g}s for page to be ready (solve CAPTCHA if prompted)...")
 
-        wait = WebDriverWait(driver, MAX_WAIT_FOR_CAPTCHA, poll_frequency=1)
+        wait = WebDriverWait(driver, PAGE_READY_WAIT, poll_frequency=1)
 
         try:
             # Wait until at least one job card is present
@@ -45,10 +51,13 @@ def scrape_jobs(query):
             time.sleep(1)
         except TimeoutException:
             # No job cards found within timeout. Try to detect if a captcha is present and inform the user.
-            print(f"Timed out after {MAX_WAIT_FOR_CAPTCHA}s waiting for job cards.")
+            print(f"Timed out after {PAGE_READY_WAIT:g}s waiting for job cards.")
             # Try a best-effort detection of common captcha iframes / elements
             try:
                 capt_iframes = driver.find_elements(By.CSS_SELECTOR, "iframe[src*='recaptcha'], iframe[src*='hcaptcha']")
+                if capt_iframes and HEADLESS:
+                    print("Captcha iframe(s) detected in the headless browser; run with SCRAPER_HEADLESS=0 to solve it by hand.")
+                    return jobs
                 if capt_iframes:
                     print("Captcha iframe(s) detected on the page. Please solve the captcha inside the browser window and try again.")
                 else:
@@ -56,6 +65,8 @@ def scrape_jobs(query):
                     page_snippet = driver.page_source[:1000]
                     print("No captcha iframe detected. Page snippet (first 1000 chars):")
                     print(page_snippet)
+            except WebDriverException:
+                raise
             except Exception as e:
                 print("Error while checking for captcha elements:", e)
 
@@ -66,65 +77,20 @@ def scrape_jobs(query):
         # =====================================================================
 
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        job_cards = soup.select("#jobs .job")
-
-        for job in job_cards[:5]:  # limit for speed
-            title_tag = job.select_one("h3.s-18 a")
-            title = title_tag.get_text(strip=True) if title_tag else None
-            link = title_tag["href"] if title_tag else None
-            if link and link.startswith("//"):
-                link = "https:" + link
-
-            company_block = job.select_one(".cname")
-            company, location = None, None
-            if company_block:
-                parts = [p.strip() for p in company_block.get_text(" ", strip=True).split(",")]
-                company = parts[0] if len(parts) > 0 else None
-                location = ", ".join(parts[1:]) if len(parts) > 1 else None
-
-            preview_desc = job.select_one(".jbody bdi")
-            preview_desc = preview_desc.get_text(strip=True) if preview_desc else None
-
-            date_tag = job.select_one(".jfooter .rz-calendar")
-            date_posted = date_tag.find_parent("span").get_text(strip=True) if date_tag else None
-
-            skill_tags = job.select(".jfooter .label")
-            skills = [s.get_text(" ", strip=True) for s in skill_tags]
-
+        for job in parse_listing(driver.page_source)[:BROWSER_MAX_RESULTS]:
             # visit detail page for full description (if link available)
-            full_desc = None
-            if link:
+            if job["link"]:
                 try:
-                    driver.get(link)
+                    browser.get(job["link"])
                     time.sleep(2)
-                    detail_soup = BeautifulSoup(driver.page_source, "html.parser")
-                    desc_container = detail_soup.select_one("div.jblk.ul18 div[dir='ltr']")
-                    if desc_container:
-                        for br in desc_container.find_all("br"):
-                            br.replace_with(" ")
-                        full_desc = desc_container.get_text(" ", strip=True)
-                except Exception:
-                    full_desc = None
-
-            jobs.append({
-                "title": title,
-                "company": company,
-                "location": location,
-                "link": link,
-                "preview_desc": preview_desc,
-                "full_desc": full_desc or preview_desc,
-                "date_posted": date_posted,
-                "skills": skills,
-                "date_scraped": date.today().strftime("%Y-%m-%d"),
-                "source": "Rozee.pk"
-            })
+                    job["full_desc"] = parse_detail(driver.page_source) or job["preview_desc"]
+                except TimeoutException:
+                    pass
+
+            jobs.append(job)
+    except WebDriverException:
+        raise  # let checkout() discard the browser instead of pooling it again
     except Exception as e:
         print("Error scraping Rozee:", e)
-    finally:
-        try:
-            driver.quit()
-        except Exception:
-            pass
 
     return jobs
\ No newline at end of file
@@ -0,0 +1,52 @@
+# jobs/search.py
+"""
+Local full-text search over stored jobs.
+
+jobs_scraped.search_vector is a generated, GIN-indexed tsvector over title
+(weight A), company and skills (B) and the description (C). A search parses
+the user's text with websearch_to_tsquery (quotes, OR and -term work as on a
+search engine), keeps hot jobs only and ranks by ts_rank_cd, newest posting
+first among equal ranks. Results page with offset/limit, and the total comes
+from the same query through a window count.
+"""
+from sqlalchemy import func
+
+from models import JOB_SEARCH_CONFIG, JobScraped
+from .lifecycle import hot_jobs_filter
+
+# Rank normalization 32 maps ts_rank_cd to rank / (rank + 1), i.e. into [0, 1)
+_RANK_NORMALIZATION = 32
+
+_DISPLAY_COLUMNS = (
+    JobScraped.id,
+    JobScraped.title,
+    JobScraped.company,
+    JobScraped.location,
+    JobScraped.link,
+    JobScraped.preview_desc,
+    JobScraped.full_desc,
+    JobScraped.skills,
+    JobScraped.date_posted,
+)
+
+
+def search_jobs_local(db, query, offset=0, limit=20):
+    """(rows, total) for one page of hot jobs matching `query`, best first."""
+    tsquery = func.websearch_to_tsquery(JOB_SEARCH_CONFIG, query)
+    rank = func.ts_rank_cd(JobScraped.search_vector, tsquery, _RANK_NORMALIZATION)
+    matches = (JobScraped.search_vector.op("@@")(tsquery), hot_jobs_filter())
+
+    rows = (
+        db.query(*_DISPLAY_COLUMNS, rank.label("rank"), func.count().over().label("total"))
+        .filter(*matches)
+        .order_by(rank.desc(), JobScraped.date_posted.desc().nullslast(), JobScraped.id.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    if rows:
+        return rows, rows[0].total
+    if offset == 0:
+        return [], 0
+    # Past the last page: the window count came back with no rows
+    return [], db.query(func.count(JobScraped.id)).filter(*matches).scalar()
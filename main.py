@@ -6,11 +6,17 @@ from schemas import UserCreate, UserLogin, UserResponse
 from auth import hash_password, verify_password, create_access_token
 from fastapi.middleware.cors import CORSMiddleware
 from userprofile import router as profile_router   # âœ… Import the profile router
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from resume_builder.generator import generate_resume
 from resume_builder.routes import router as resume_generator_router
 from resume_upload.routes import router as resume_upload_router
 from jobs.routes import router as jobs_router
+from jobs.index import job_index
+from jobs.lifecycle import start_sweeper
+from jobs.browser_pool import browser_pool
+from jobs.http_scraper import http_scraper
+from jobs.crawler import crawl_scraper, start_crawler
+from model_registry import registry
 from resume_tailoring.routes import router as tailor_router
 from text_interview.routes import router as text_interview_router
 from cover_letter.routes import router as cover_letter_router
@@ -23,6 +29,27 @@ Base.metadata.create_all(bind=engine)
 
 app = FastAPI()
 
+# ✅ Load the resident job match index once per process
+@app.on_event("startup")
+def load_job_index():
+    # Models marked eager load in the background; /ready reports progress
+    registry.start_eager_loading()
+    job_index.build()
+    # Follow embedding snapshots published by other workers
+    app.state.index_watch_stop = job_index.watch_store()
+    # Archive stale jobs now and periodically; the index keeps hot jobs only
+    start_sweeper()
+    # Keep the corpus fresh in the background instead of scraping per search
+    app.state.crawler_stop = start_crawler()
+
+@app.on_event("shutdown")
+def close_scrapers():
+    app.state.crawler_stop.set()
+    app.state.index_watch_stop.set()
+    browser_pool.close()
+    http_scraper.close()
+    crawl_scraper.close()
+
 # âœ… CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -36,6 +63,13 @@ app.add_middleware(
 def root():
     return {"message": "WorkMate API running ðŸš€"}
 
+# ✅ Readiness: 503 until eager models are loaded; per-model load time and memory
+@app.get("/ready")
+def ready():
+    status = registry.status()
+    status["job_index"] = job_index.stats()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
 # âœ… Signup route
 @app.post("/signup", response_model=UserResponse)
 def signup(user: UserCreate, db: Session = Depends(get_db)):
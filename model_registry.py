@@ -0,0 +1,143 @@
+# model_registry.py
+"""
+One place that owns every ML model the API uses.
+
+Modules register a loader (and optionally a warmup call) under a name at
+import time, which costs nothing; the model itself is built on the first
+registry.get(name) and then shared by every request. Models listed in
+MODELS_EAGER ("all", "none" or comma-separated names; default: the ones
+registered with eager=True) are loaded in the background at startup instead.
+After loading, a warmup inference runs so the first real request does not pay
+for lazy initialisation inside the framework.
+
+status() reports, per model, its state, load and warmup time and the process
+RSS growth while it loaded; /ready serves it and returns 503 until every eager
+model is ready.
+"""
+import os
+import threading
+import time
+
+MODELS_EAGER = os.getenv("MODELS_EAGER")  # unset: per-model default
+MODELS_WARMUP = os.getenv("MODELS_WARMUP", "1") != "0"
+
+UNLOADED, LOADING, READY, FAILED = "unloaded", "loading", "ready", "failed"
+
+
+def _rss_bytes():
+    """Resident set size of this process, or None when it cannot be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ModelEntry:
+    def __init__(self, name, loader, warmup=None, eager=False):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.eager = eager
+        self.model = None
+        self.state = UNLOADED
+        self.error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.rss_delta_mb = None
+        self.lock = threading.Lock()
+
+    def status(self):
+        return {
+            "state": self.state,
+            "eager": self.eager,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "warmup_seconds": round(self.warmup_seconds, 3) if self.warmup_seconds is not None else None,
+            "rss_delta_mb": self.rss_delta_mb,
+            "error": self.error,
+        }
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader, warmup=None, eager=False):
+        """Declare a model; `loader()` builds it and `warmup(model)` exercises it once."""
+        with self._lock:
+            if name not in self._entries:
+                if MODELS_EAGER is not None:
+                    wanted = {n.strip() for n in MODELS_EAGER.split(",")}
+                    eager = "all" in wanted or name in wanted
+                self._entries[name] = ModelEntry(name, loader, warmup, eager)
+            return self._entries[name]
+
+    def get(self, name):
+        """The loaded model, loading (and warming up) it on first use."""
+        entry = self._entries[name]
+        if entry.state == READY:
+            return entry.model
+        with entry.lock:
+            if entry.state != READY:
+                self._load(entry)
+        return entry.model
+
+    def _load(self, entry):
+        entry.state, entry.error = LOADING, None
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        try:
+            model = entry.loader()
+            entry.load_seconds = time.perf_counter() - started
+            if MODELS_WARMUP and entry.warmup is not None:
+                started = time.perf_counter()
+                entry.warmup(model)
+                entry.warmup_seconds = time.perf_counter() - started
+        except Exception as e:
+            entry.state, entry.error = FAILED, str(e)
+            print(f"Model '{entry.name}' failed to load: {e}")
+            raise
+        rss_after = _rss_bytes()
+        if rss_before is not None and rss_after is not None:
+            entry.rss_delta_mb = round((rss_after - rss_before) / 2**20, 1)
+        entry.model, entry.state = model, READY
+        print(f"Model '{entry.name}' ready in {entry.load_seconds:.1f}s")
+
+    def is_loaded(self, name):
+        entry = self._entries.get(name)
+        return entry is not None and entry.state == READY
+
+    def load_eager(self):
+        """Load every eager model now, one after another (failures are recorded)."""
+        for entry in list(self._entries.values()):
+            if entry.eager:
+                try:
+                    self.get(entry.name)
+                except Exception:
+                    pass
+
+    def start_eager_loading(self):
+        """load_eager() on a daemon thread so startup is not blocked."""
+        thread = threading.Thread(target=self.load_eager, name="model-loader", daemon=True)
+        thread.start()
+        return thread
+
+    def ready(self):
+        return all(entry.state == READY for entry in self._entries.values() if entry.eager)
+
+    def status(self):
+        rss = _rss_bytes()
+        return {
+            "ready": self.ready(),
+            "rss_mb": round(rss / 2**20, 1) if rss is not None else None,
+            "models": {name: entry.status() for name, entry in self._entries.items()},
+        }
+
+
+registry = ModelRegistry()
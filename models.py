@@ -3,7 +3,9 @@ from sqlalchemy.dialects.postgresql import JSONB
 from database import Base
 from sqlalchemy import Float, DateTime
 from sqlalchemy.sql import func
-from sqlalchemy import LargeBinary 
+from sqlalchemy import LargeBinary, BigInteger, UniqueConstraint, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 
 # -----------------------------
 # User Model
@@ -37,24 +39,94 @@ class Profile(Base):
 # -----------------------------
 # Scraped Jobs Model (REQUIRED)
 # -----------------------------
+# Weighted full-text document for /jobs/search: title > company, skills > description
+JOB_SEARCH_CONFIG = "english"
+JOB_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(company, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(skills::text, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(full_desc, preview_desc, '')), 'C')"
+)
+
 class JobScraped(Base):
     __tablename__ = "jobs_scraped"
+    __table_args__ = (Index("ix_jobs_scraped_search", "search_vector", postgresql_using="gin"),)
 
     id = Column(Integer, primary_key=True, index=True)
 
     title = Column(String, index=True)
     company = Column(String)
     location = Column(String)
-    link = Column(String)
+    link = Column(String, unique=True, index=True) # normalized, see jobs.dedup.normalize_link
 
     preview_desc = Column(String)
     full_desc = Column(String)
 
     skills = Column(JSON)
     date_posted = Column(Date)
+    date_scraped = Column(Date, nullable=True)
     extracted_skills = Column(JSON, nullable=True) # cached NLP skills
     embedding = Column(LargeBinary, nullable=True) # serialized float32 vector
     exp_score = Column(Float, nullable=True) # cached experience score
+    simhash = Column(BigInteger, nullable=True, index=True) # near-duplicate fingerprint
+    # Maintained by Postgres, GIN-indexed; deferred so ORM loads skip it
+    search_vector = deferred(Column(TSVECTOR, Computed(JOB_SEARCH_VECTOR_SQL, persisted=True)))
+
+# -----------------------------
+# Jobs past the freshness window (see jobs.lifecycle)
+# -----------------------------
+class JobArchived(Base):
+    __tablename__ = "jobs_archived"
+
+    id = Column(Integer, primary_key=True, autoincrement=False) # id it had in jobs_scraped
+
+    title = Column(String)
+    company = Column(String)
+    location = Column(String)
+    link = Column(String, index=True)
+
+    preview_desc = Column(String)
+    full_desc = Column(String)
+
+    skills = Column(JSON)
+    date_posted = Column(Date)
+    date_scraped = Column(Date)
+    extracted_skills = Column(JSON, nullable=True)
+    embedding = Column(LargeBinary, nullable=True)
+    exp_score = Column(Float, nullable=True)
+    simhash = Column(BigInteger, nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# -----------------------------
+# Nightly "top jobs for you" digest rows
+# -----------------------------
+class JobDigest(Base):
+    __tablename__ = "job_digests"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_email = Column(String, index=True)
+    job_id = Column(Integer, ForeignKey("jobs_scraped.id", ondelete="CASCADE"))
+    rank = Column(Integer)
+    score = Column(Float)
+    corpus_version = Column(String) # JobIndex.corpus_version the ranking was computed on
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# -----------------------------
+# Crawl frontier: one row per (source, query, results page), see jobs.crawler
+# -----------------------------
+class CrawlFrontier(Base):
+    __tablename__ = "crawl_frontier"
+    __table_args__ = (UniqueConstraint("source", "query", "page", name="uq_crawl_frontier_page"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String, nullable=False)
+    query = Column(String, nullable=False) # normalized, see jobs.scrape_cache.normalize_query
+    page = Column(Integer, nullable=False, default=0)
+    next_run_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+    interval_minutes = Column(Float, nullable=False) # grows while a page yields nothing new
+    last_new = Column(Integer, default=0) # new listings found on the last run
+    failures = Column(Integer, default=0)
 
 class InterviewResult(Base):
     __tablename__ = "interview_results"
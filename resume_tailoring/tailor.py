@@ -1,11 +1,15 @@
 # resume_tailoring/tailor.py
 
 from typing import Dict, List
-from sentence_transformers import SentenceTransformer, util
 from groq import Groq
 
 import re
 
+from jobs.gazetteer import get_gazetteer
+from embedding_backend import load_sentence_encoder
+from embedding_cache import cached_encode
+from model_registry import registry
+
 def get_groq_client(api_key: str):
     """Initialize and return Groq client"""
     return Groq(api_key=api_key)
@@ -13,7 +17,18 @@ def get_groq_client(api_key: str):
 # Load Semantic Model (SBERT)
 # -----------------------------
 # NOTE: You may change the model to a faster one if needed.
-model = SentenceTransformer("all-mpnet-base-v2")
+SEMANTIC_MODEL = "all-mpnet-base-v2"
+
+
+def _load_semantic_model():
+    return load_sentence_encoder(SEMANTIC_MODEL)
+
+
+registry.register(
+    "tailor.semantic",
+    _load_semantic_model,
+    warmup=lambda model: model.encode(["Built REST APIs with FastAPI"], convert_to_tensor=True),
+)
 
 
 # -----------------------------
@@ -31,16 +46,16 @@ def extract_job_keywords(job: Dict) -> Dict:
     desc = job.get("full_desc") or job.get("preview_desc") or ""
     skills = job.get("skills") or []
 
-    # Extract tech keywords (very simple version)
-    tech_pattern = r"\b(Python|TensorFlow|React|SQL|Machine Learning|NLP|AI|ETL|Linux|Docker|AWS|Keras|PyTorch|Data Analysis|Pandas|NumPy)\b"
-    found_tech = re.findall(tech_pattern, desc, flags=re.IGNORECASE)
+    # Extract tech keywords with the same skill gazetteer the job matcher uses
+    gazetteer = get_gazetteer()
+    found_tech = gazetteer.extract(desc)
 
     # Extract action verbs (research-backed resume optimization)
     verbs_pattern = r"\b(Develop|Build|Design|Optimize|Analyze|Lead|Implement|Deploy|Integrate|Automate|Evaluate|Train|Research)\w*\b"
     found_verbs = re.findall(verbs_pattern, desc, flags=re.IGNORECASE)
 
     return {
-        "skills_required": list(set([s.lower() for s in skills + found_tech])),
+        "skills_required": list(set([gazetteer.normalize(s) for s in skills + found_tech])),
         "verbs_required": list(set([v.lower() for v in found_verbs])),
         "raw_text": desc,
     }
@@ -53,14 +68,15 @@ def semantic_match(user_items: List[str], job_text: str, top_n=3):
     if not user_items:
         return []
 
-    embeddings_items = model.encode(user_items, convert_to_tensor=True)
-    embedding_job = model.encode(job_text, convert_to_tensor=True)
+    # Skill strings and job descriptions repeat across requests: encode via the cache
+    vecs = cached_encode(SEMANTIC_MODEL, lambda: registry.get("tailor.semantic"), [*user_items, job_text])
 
-    scores = util.cos_sim(embeddings_items, embedding_job)
+    # Unit vectors, so the dot product is the cosine similarity
+    scores = vecs[:-1] @ vecs[-1]
 
     # Rank user items by similarity
     ranked = sorted(
-        [(user_items[i], float(scores[i][0])) for i in range(len(user_items))],
+        [(user_items[i], float(scores[i])) for i in range(len(user_items))],
         key=lambda x: x[1],
         reverse=True,
     )
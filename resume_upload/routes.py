@@ -9,6 +9,7 @@ from docx import Document
 from groq import Groq
 from dotenv import load_dotenv
 from auth import get_current_user
+from jobs.profile_cache import invalidate_profile
 
 router = APIRouter(prefix="/resume", tags=["Resume"])
 
@@ -166,6 +167,7 @@ def autofill_profile(
 
         db.commit()
         db.refresh(profile)
+        invalidate_profile(current_user_email)
 
     finally:
         if os.path.exists(file_location):
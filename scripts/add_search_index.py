@@ -0,0 +1,27 @@
+"""
+One-off migration for databases created before local job search: adds the
+generated jobs_scraped.search_vector column and its GIN index. Postgres fills
+the column for existing rows while adding it, and keeps it current on every
+insert and update afterwards.
+"""
+import sys
+sys.path.append(".")
+
+from sqlalchemy import text
+
+from database import engine
+from models import JOB_SEARCH_VECTOR_SQL
+
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+    print("Adding search_vector column (rewrites jobs_scraped)...")
+    conn.execute(text(
+        "ALTER TABLE jobs_scraped ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({JOB_SEARCH_VECTOR_SQL}) STORED"
+    ))
+    print("Creating GIN index...")
+    conn.execute(text(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_jobs_scraped_search "
+        "ON jobs_scraped USING gin (search_vector)"
+    ))
+print("Done!")
@@ -0,0 +1,18 @@
+"""
+One-off migration for databases created before corpus versions were shared
+across workers: job_digests.corpus_version changes from an integer counter to
+the JobIndex.corpus_version string.
+"""
+import sys
+sys.path.append(".")
+
+from sqlalchemy import text
+
+from database import engine
+
+with engine.begin() as conn:
+    print("Altering job_digests.corpus_version to varchar...")
+    conn.execute(text(
+        "ALTER TABLE job_digests ALTER COLUMN corpus_version TYPE varchar USING corpus_version::text"
+    ))
+print("Done!")
@@ -1,28 +1,138 @@
+"""
+Backfill match features (extracted skills, experience, embedding) for jobs.
 
+    python scripts/backfill_embeddings.py                  # jobs missing an embedding
+    python scripts/backfill_embeddings.py --all --workers 8
+    python scripts/backfill_embeddings.py --restart        # ignore the checkpoint
+
+Job ids are streamed with keyset pagination in --chunk-size chunks, so memory
+stays bounded whatever the table size. Within a chunk, skill extraction and
+experience scoring run on a process pool while this process batch-encodes the
+embeddings; results are written with one bulk UPDATE and committed per chunk.
+The last committed id is checkpointed, so an interrupted run picks up where it
+stopped.
+"""
+import argparse
+import json
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
 sys.path.append(".")
 
 from database import SessionLocal
 from models import JobScraped
-from jobs.matcher import precompute_job
+from jobs.matcher import SKILL_BATCH_SIZE, get_embedder, job_embedding_text, serialize_vec
+
+parser = argparse.ArgumentParser(description="Resumable parallel match-feature backfill")
+parser.add_argument("--all", action="store_true", help="recompute every job, not only those missing an embedding")
+parser.add_argument("--chunk-size", type=int, default=2000, help="jobs per keyset page and commit")
+parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1), help="skill extraction processes")
+parser.add_argument("--checkpoint", default=".backfill_checkpoint.json", help="resume file")
+parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+
+
+def extract_features(titles, descriptions):
+    """Worker: extracted skills and experience score for a slice of jobs."""
+    from jobs.matcher import extract_skills_batch, infer_experience_level
+
+    extracted = extract_skills_batch(descriptions, n_process=1)
+    exp = [infer_experience_level(desc, title=title) for title, desc in zip(titles, descriptions)]
+    return extracted, exp
+
+
+def load_checkpoint():
+    if args.restart or not os.path.exists(args.checkpoint):
+        return {"last_id": 0, "done": 0}
+    with open(args.checkpoint) as f:
+        checkpoint = json.load(f)
+    print(f"Resuming after job id {checkpoint['last_id']} ({checkpoint['done']} done before)")
+    return checkpoint
+
+
+def save_checkpoint(checkpoint):
+    tmp = args.checkpoint + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, args.checkpoint)  # atomic: never a half-written checkpoint
+
+
+def pending(db, after_id):
+    query = db.query(JobScraped.id).filter(JobScraped.id > after_id)
+    if not args.all:
+        query = query.filter(JobScraped.embedding.is_(None))
+    return query
+
+
+def backfill_chunk(db, pool, rows):
+    titles = [row.title for row in rows]
+    descriptions = [row.full_desc or row.preview_desc or "" for row in rows]
+    skills = [row.skills if isinstance(row.skills, list) else [] for row in rows]
+
+    # Skill extraction fans out to the workers while this process encodes
+    step = -(-len(rows) // args.workers)
+    futures = [
+        pool.submit(extract_features, titles[i:i + step], descriptions[i:i + step])
+        for i in range(0, len(rows), step)
+    ]
+    vecs = get_embedder().encode(
+        [job_embedding_text(t, d, s) for t, d, s in zip(titles, descriptions, skills)],
+        batch_size=SKILL_BATCH_SIZE,
+        normalize_embeddings=True
+    )
+    extracted, exp = [], []
+    for future in futures:
+        part_skills, part_exp = future.result()
+        extracted.extend(part_skills)
+        exp.extend(part_exp)
+
+    db.bulk_update_mappings(JobScraped, [
+        {"id": row.id, "extracted_skills": job_skills, "exp_score": job_exp, "embedding": serialize_vec(vec)}
+        for row, job_skills, job_exp, vec in zip(rows, extracted, exp, vecs)
+    ])
+    db.commit()
+
+
+if __name__ == "__main__":  # spawned workers import this module too
+    args = parser.parse_args()
+    db = SessionLocal()
+    checkpoint = load_checkpoint()
+    total = pending(db, checkpoint["last_id"]).count()
+    print(f"Found {total} jobs to backfill ({args.workers} workers, chunks of {args.chunk_size}).")
 
-db = SessionLocal()
-print("Connecting to database and fetching jobs...")
+    started = time.perf_counter()
+    done = 0
+    # spawn: workers must not inherit the parent's torch thread pools
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=get_context("spawn")) as pool:
+        while True:
+            ids = [job_id for (job_id,) in
+                   pending(db, checkpoint["last_id"]).order_by(JobScraped.id).limit(args.chunk_size)]
+            if not ids:
+                break
+            rows = db.query(
+                JobScraped.id, JobScraped.title, JobScraped.full_desc, JobScraped.preview_desc, JobScraped.skills
+            ).filter(JobScraped.id.in_(ids)).order_by(JobScraped.id).all()
 
-# Use .is_(None) instead of == None
-jobs = db.query(JobScraped).filter(JobScraped.embedding.is_(None)).all()
-print(f"Found {len(jobs)} jobs missing embeddings.")
+            try:
+                backfill_chunk(db, pool, rows)
+            except Exception as e:
+                db.rollback()
+                print(f"❌ Error on jobs {ids[0]}..{ids[-1]}: {e}")
+                print("Stopping; rerun to resume from the last committed chunk.")
+                break
 
-if len(jobs) > 0:
-    print(f"Starting backfill for {len(jobs)} jobs...")
+            done += len(ids)
+            checkpoint = {"last_id": ids[-1], "done": checkpoint["done"] + len(ids)}
+            save_checkpoint(checkpoint)
 
-for i, job in enumerate(jobs):
-    try:
-        precompute_job(job, db)
-        if i % 10 == 0:  # Print every 10 jobs so you see it working faster
-            print(f"  Processed {i}/{len(jobs)}")
-    except Exception as e:
-        print(f"❌ Error on job ID {job.id}: {e}")
+            elapsed = time.perf_counter() - started
+            rate = done / elapsed if elapsed else 0.0
+            eta = (total - done) / rate if rate else 0.0
+            print(f"  {done}/{total} jobs  {rate:.1f} jobs/s  ETA {eta / 60:.1f} min  (last id {ids[-1]})")
 
-db.close()
-print("Done!")
\ No newline at end of file
+    db.close()
+    if done >= total and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)  # finished: next run starts from the beginning
+    elapsed = time.perf_counter() - started
+    print(f"Done! {done} jobs in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.1f} jobs/s)")
@@ -0,0 +1,144 @@
+"""
+Benchmark the Rozee HTML parser backends on saved pages.
+
+    python scripts/bench_parsers.py                        # every installed backend
+    python scripts/bench_parsers.py --backends lxml,bs4 --iterations 200
+    python scripts/bench_parsers.py --save "data scientist" # add live pages as fixtures
+
+Fixtures live in scripts/fixtures/rozee: listing_*.html are search results
+pages and detail_*.html are job pages. For each backend the script reports
+pages/sec and tracemalloc allocations per page, and checks that every backend
+extracts the same cards and descriptions as the first one. It exits non-zero
+when a listing fixture yields no cards or the backends disagree, so a selector
+change that breaks parsing shows up here before it shows up in production.
+
+Only saved pages can show selector drift: fixtures marked SYNTHETIC_MARKER
+were written by hand from the selectors and are reported as such.
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+import tracemalloc
+sys.path.append(".")
+
+from jobs.parsers import available_backends, get_backend
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "rozee")
+SYNTHETIC_MARKER = "<!-- synthetic:"
+
+
+def load_fixtures(directory):
+    pages = {"listing": [], "detail": []}
+    for kind in pages:
+        for path in sorted(glob.glob(os.path.join(directory, f"{kind}_*.html"))):
+            with open(path, encoding="utf-8") as f:
+                pages[kind].append((os.path.basename(path), f.read()))
+    return pages
+
+
+def parse_all(backend, pages):
+    listings = [backend.parse_listing(html) for _, html in pages["listing"]]
+    details = [backend.parse_detail(html) for _, html in pages["detail"]]
+    return listings, details
+
+
+def comparable(listings, details):
+    # date_scraped is today's date and not part of the page
+    cards = [[{k: v for k, v in card.items() if k != "date_scraped"} for card in page] for page in listings]
+    return cards, details
+
+
+def bench(backend, pages, iterations):
+    n_pages = len(pages["listing"]) + len(pages["detail"])
+    parse_all(backend, pages)  # warm up imports and caches
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        parse_all(backend, pages)
+    seconds = time.perf_counter() - started
+
+    # Allocations measured on a separate pass; tracing slows parsing down
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    parsed = parse_all(backend, pages)  # held so "kept" counts the parsed output
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del parsed
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename") if stat.size_diff > 0)
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+    return {
+        "pages_per_sec": n_pages * iterations / seconds if seconds else float("inf"),
+        "ms_per_page": seconds * 1000 / (n_pages * iterations),
+        "peak_kb_per_page": peak / 1024 / n_pages,
+        "retained_kb_per_page": allocated / 1024 / n_pages,
+        "blocks_per_page": blocks / n_pages,
+    }
+
+
+def save_live_pages(query, directory):
+    from jobs.http_scraper import http_scraper, listing_url
+
+    slug = re.sub(r"[^a-z0-9]+", "_", query.lower()).strip("_")
+    listing = http_scraper.run(http_scraper.fetch(listing_url(query)))
+    with open(os.path.join(directory, f"listing_{slug}.html"), "w", encoding="utf-8") as f:
+        f.write(listing)
+    cards = get_backend().parse_listing(listing)
+    if cards and cards[0]["link"]:
+        detail = http_scraper.run(http_scraper.fetch(cards[0]["link"]))
+        with open(os.path.join(directory, f"detail_{slug}.html"), "w", encoding="utf-8") as f:
+            f.write(detail)
+    http_scraper.close()
+    print(f"Saved fixtures for '{query}' ({len(cards)} cards) to {directory}")
+
+
+parser = argparse.ArgumentParser(description="Rozee HTML parser backend benchmark")
+parser.add_argument("--backends", default=None, help="comma-separated (default: all installed)")
+parser.add_argument("--iterations", type=int, default=100, help="passes over the fixture set")
+parser.add_argument("--fixtures", default=FIXTURES, help="directory of listing_*/detail_*.html")
+parser.add_argument("--save", default=None, metavar="QUERY", help="fetch live pages for QUERY into the fixtures")
+args = parser.parse_args()
+
+if args.save:
+    save_live_pages(args.save, args.fixtures)
+    sys.exit(0)
+
+pages = load_fixtures(args.fixtures)
+if not pages["listing"] and not pages["detail"]:
+    sys.exit(f"No fixtures found in {args.fixtures}")
+
+synthetic = [name for kind in pages.values() for name, html in kind if SYNTHETIC_MARKER in html[:500]]
+if synthetic:
+    print(f"Warning: {', '.join(synthetic)} are synthetic; save real pages with --save QUERY\n")
+
+names = [b.strip() for b in args.backends.split(",")] if args.backends else available_backends()
+if not names:
+    sys.exit("No HTML parser backend installed: need selectolax, lxml or beautifulsoup4")
+print(f"{len(pages['listing'])} listing + {len(pages['detail'])} detail pages, {args.iterations} iterations\n")
+print(f"{'backend':<12}{'pages/s':>10}{'ms/page':>10}{'peak KB':>10}{'kept KB':>10}{'blocks':>10}")
+
+failed = False
+reference = None
+for name in names:
+    backend = get_backend(name)
+    listings, details = parse_all(backend, pages)
+    for (fixture, _), cards in zip(pages["listing"], listings):
+        if not cards:
+            print(f"  {name}: no job cards in {fixture}")
+            failed = True
+    result = comparable(listings, details)
+    if reference is None:
+        reference = (name, result)
+    elif result != reference[1]:
+        print(f"  {name}: output differs from {reference[0]}")
+        failed = True
+
+    stats = bench(backend, pages, args.iterations)
+    print(f"{name:<12}{stats['pages_per_sec']:>10.1f}{stats['ms_per_page']:>10.2f}"
+          f"{stats['peak_kb_per_page']:>10.1f}{stats['retained_kb_per_page']:>10.1f}{stats['blocks_per_page']:>10.0f}")
+
+sys.exit(1 if failed else 0)
@@ -0,0 +1,41 @@
+"""
+Regenerate the skill gazetteer vocabulary from the job corpus.
+
+    python scripts/build_skill_vocabulary.py               # labels on >= 2 jobs
+    python scripts/build_skill_vocabulary.py --min-jobs 5 --output /srv/skill_vocabulary.txt
+
+Collects the scraped and extracted skill labels stored on jobs_scraped and
+writes the ones seen on at least --min-jobs jobs, sorted, one per line. The
+workers read this file when they start (see jobs.gazetteer), so commit or
+deploy it and restart them together; then re-run scripts/backfill_embeddings.py
+--all if stored extracted skills should pick up the new entries.
+"""
+import argparse
+import os
+import sys
+sys.path.append(".")
+
+from database import SessionLocal
+from jobs.gazetteer import SEED_SKILLS, SKILL_VOCABULARY_PATH, load_corpus_skills, skill_key
+
+parser = argparse.ArgumentParser(description="Build the skill gazetteer vocabulary file")
+parser.add_argument("--min-jobs", type=int, default=2, help="drop labels seen on fewer jobs")
+parser.add_argument("--output", default=SKILL_VOCABULARY_PATH, help="vocabulary file to write")
+args = parser.parse_args()
+
+db = SessionLocal()
+try:
+    print("Collecting skill labels...")
+    counts = load_corpus_skills(db)
+finally:
+    db.close()
+
+seeds = set(filter(None, map(skill_key, SEED_SKILLS)))
+skills = sorted(key for key, n in counts.items() if n >= args.min_jobs and key not in seeds)
+
+tmp = args.output + ".tmp"
+with open(tmp, "w", encoding="utf-8") as f:
+    f.write(f"# Generated by scripts/build_skill_vocabulary.py (--min-jobs {args.min_jobs})\n")
+    f.writelines(skill + "\n" for skill in skills)
+os.replace(tmp, args.output)
+print(f"Done! {len(skills)} skills ({len(counts)} distinct labels) written to {args.output}")
@@ -0,0 +1,61 @@
+"""
+One-off migration for databases created before jobs were deduplicated:
+adds the new jobs_scraped columns, normalizes links, removes exact and
+near-duplicate rows (keeping the oldest) and creates the unique link index
+that /jobs/search upserts against. Restart the API afterwards so the match
+index is rebuilt. Safe to re-run; it also recomputes every stored
+fingerprint, e.g. after the SimHash inputs change.
+"""
+import sys
+sys.path.append(".")
+
+from sqlalchemy import text
+
+from database import SessionLocal
+from models import JobScraped
+from jobs.dedup import SimHashIndex, identity_key, near_dup_distance, normalize_link, simhash
+
+db = SessionLocal()
+print("Adding missing columns...")
+db.execute(text("ALTER TABLE jobs_scraped ADD COLUMN IF NOT EXISTS date_scraped DATE"))
+db.execute(text("ALTER TABLE jobs_scraped ADD COLUMN IF NOT EXISTS simhash BIGINT"))
+db.commit()
+
+rows = db.query(
+    JobScraped.id, JobScraped.link, JobScraped.title, JobScraped.company, JobScraped.location,
+    JobScraped.full_desc, JobScraped.preview_desc
+).order_by(JobScraped.id).all()
+print(f"Checking {len(rows)} jobs for duplicates...")
+
+seen_links = set()
+near_index = SimHashIndex()
+duplicates = []
+updates = []
+for row in rows:
+    link = normalize_link(row.link)
+    description = row.full_desc or row.preview_desc
+    fingerprint = simhash(row.title, row.company, row.location, description)
+    key = identity_key(row.title, row.company, row.location)
+    if (link and link in seen_links) or near_index.find(fingerprint, near_dup_distance(description), key) is not None:
+        duplicates.append(row.id)
+        continue
+    if link:
+        seen_links.add(link)
+    near_index.add(row.id, fingerprint, key)
+    updates.append({"id": row.id, "link": link, "simhash": fingerprint})
+
+print(f"Removing {len(duplicates)} duplicate jobs...")
+for start in range(0, len(duplicates), 1000):
+    db.query(JobScraped).filter(JobScraped.id.in_(duplicates[start:start + 1000])).delete(synchronize_session=False)
+db.commit()
+
+print("Normalizing links and storing fingerprints...")
+for start in range(0, len(updates), 1000):
+    db.bulk_update_mappings(JobScraped, updates[start:start + 1000])
+    db.commit()
+
+db.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_jobs_scraped_link ON jobs_scraped (link)"))
+db.execute(text("CREATE INDEX IF NOT EXISTS ix_jobs_scraped_simhash ON jobs_scraped (simhash)"))
+db.commit()
+db.close()
+print("Done!")
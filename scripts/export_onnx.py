@@ -0,0 +1,130 @@
+"""
+Export the sentence embedders to int8 ONNX and check parity with PyTorch.
+
+    python scripts/export_onnx.py                       # MiniLM (jobs) + mpnet (tailor)
+    python scripts/export_onnx.py --models sentence-transformers/all-MiniLM-L6-v2
+    python scripts/export_onnx.py --check-only          # parity of existing exports
+
+Each model's transformer is exported with dynamic batch/sequence axes,
+quantized with ONNX Runtime dynamic int8 quantization and written to
+ONNX_MODEL_DIR/<model> together with its tokenizer; set EMBEDDING_BACKEND=onnx
+to serve it. The parity check encodes sample texts with both backends and
+fails (exit 1) when any cosine similarity drops below --min-cosine. It also
+prints the encode speedup.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+sys.path.append(".")
+
+import numpy as np
+
+from embedding_backend import CONFIG_FILE, ONNX_FILE, OnnxSentenceEncoder, onnx_dir
+from jobs.matcher import EMBEDDING_MODEL
+from resume_tailoring.tailor import SEMANTIC_MODEL
+
+PARITY_TEXTS = [
+    "Senior Python Developer with Django, FastAPI and PostgreSQL experience",
+    "We are hiring a React Native developer to build cross-platform mobile apps.",
+    "Data scientist: machine learning, pandas, scikit-learn and TensorFlow. 3+ years.",
+    "DevOps engineer to own CI/CD pipelines on AWS with Docker and Kubernetes",
+    "Built a REST API for an e-commerce store and deployed it on Heroku",
+    "Final year project: real-time sign language recognition using OpenCV and CNNs",
+    "Looking for a QA automation engineer familiar with Selenium and Cypress.",
+    "Internship",
+    "Led a team of four engineers delivering a payments microservice in Go and gRPC, "
+    "with Kafka event streaming, Redis caching and end-to-end observability via Prometheus.",
+]
+
+
+def export(model_name, out_dir, opset):
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    st = SentenceTransformer(model_name, device="cpu")
+    transformer, pooling = st[0], st[1]
+    if not getattr(pooling, "pooling_mode_mean_tokens", False):
+        raise ValueError(f"{model_name} does not use mean pooling; the ONNX encoder only implements mean")
+
+    tokenizer = transformer.tokenizer
+    sample = tokenizer(["a sample sentence to trace"], return_tensors="pt")
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+
+    class HiddenStates(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    os.makedirs(out_dir, exist_ok=True)
+    fp32_path = os.path.join(out_dir, "model.fp32.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            HiddenStates(transformer.auto_model.eval()),
+            tuple(sample[n] for n in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]},
+            opset_version=opset,
+        )
+    quantize_dynamic(fp32_path, os.path.join(out_dir, ONNX_FILE), weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+
+    tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, CONFIG_FILE), "w") as f:
+        json.dump({
+            "model": model_name,
+            "dim": st.get_sentence_embedding_dimension(),
+            "max_seq_length": st.max_seq_length,
+            "pooling": "mean",
+            "normalize": any(type(module).__name__ == "Normalize" for module in st),
+        }, f, indent=2)
+    size_mb = os.path.getsize(os.path.join(out_dir, ONNX_FILE)) / 2**20
+    print(f"Exported {model_name} -> {out_dir} ({size_mb:.1f} MB int8)")
+
+
+def check_parity(model_name, out_dir, min_cosine, repeats=5):
+    from sentence_transformers import SentenceTransformer
+
+    reference = SentenceTransformer(model_name, device="cpu")
+    candidate = OnnxSentenceEncoder(out_dir)
+
+    def timed(model):
+        model.encode(PARITY_TEXTS, normalize_embeddings=True)  # warm up
+        started = time.perf_counter()
+        for _ in range(repeats):
+            vecs = model.encode(PARITY_TEXTS, normalize_embeddings=True)
+        return np.asarray(vecs, dtype=np.float32), (time.perf_counter() - started) / repeats
+
+    torch_vecs, torch_s = timed(reference)
+    onnx_vecs, onnx_s = timed(candidate)
+    cosines = (torch_vecs * onnx_vecs).sum(axis=1)
+
+    ok = bool(cosines.min() >= min_cosine)
+    print(f"{model_name}: cosine min {cosines.min():.4f} mean {cosines.mean():.4f} "
+          f"(need >= {min_cosine}); torch {torch_s * 1000:.0f} ms, onnx {onnx_s * 1000:.0f} ms, "
+          f"speedup {torch_s / onnx_s:.1f}x  {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+parser = argparse.ArgumentParser(description="Int8 ONNX export of the sentence embedders")
+parser.add_argument("--models", default=f"{EMBEDDING_MODEL},{SEMANTIC_MODEL}", help="comma-separated model names")
+parser.add_argument("--opset", type=int, default=17)
+parser.add_argument("--min-cosine", type=float, default=0.99, help="parity threshold per text")
+parser.add_argument("--check-only", action="store_true", help="skip export, only compare")
+args = parser.parse_args()
+
+failed = False
+for model_name in [m.strip() for m in args.models.split(",") if m.strip()]:
+    out_dir = onnx_dir(model_name)
+    if not args.check_only:
+        export(model_name, out_dir, args.opset)
+    failed |= not check_parity(model_name, out_dir, args.min_cosine)
+
+sys.exit(1 if failed else 0)
@@ -0,0 +1,28 @@
+"""
+Write each user's top jobs to job_digests.
+
+    python scripts/nightly_digest.py                 # every profile
+    python scripts/nightly_digest.py --top-k 10 --emails a@x.com,b@y.com
+"""
+import argparse
+import sys
+sys.path.append(".")
+
+from database import SessionLocal
+from jobs.digest import run_digest
+
+parser = argparse.ArgumentParser(description="Bulk job matching for daily digests")
+parser.add_argument("--top-k", type=int, default=20, help="jobs stored per user")
+parser.add_argument("--emails", default=None, help="comma-separated cohort (default: all profiles)")
+args = parser.parse_args()
+
+emails = [e.strip() for e in args.emails.split(",") if e.strip()] if args.emails else None
+
+db = SessionLocal()
+try:
+    print("Running digest...")
+    summary = run_digest(db, emails=emails, top_k=args.top_k)
+    print(f"Done! {summary['users']} users x {summary['jobs']} jobs in {summary['seconds']}s "
+          f"(corpus version {summary['corpus_version']})")
+finally:
+    db.close()
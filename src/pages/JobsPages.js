@@ -10,6 +10,8 @@ const COUNTRIES = [
 ];
 
 const JOB_TYPES = ["All Types", "Full-time", "Part-time", "Contract", "Internship", "Remote"];
+const MATCH_PAGE_SIZE = 50;
+const SEARCH_PAGE_SIZE = 50;
 
 // ── Circular match score ──────────────────────────────────────────────────────
 const CircularProgress = ({ percentage }) => {
@@ -156,7 +158,7 @@ const JobsPage = () => {
   const [jobs, setJobs] = useState([]);
   const [loading, setLoading] = useState(false);
   const [viewingMatched, setViewingMatched] = useState(true);
-  const [sortBy, setSortBy] = useState("best_match");
+  const [sortBy, setSortBy] = useState("score");
   const [selectedCountry, setSelectedCountry] = useState("All Countries");
   const [selectedType, setSelectedType] = useState("All Types");
   const [showFilters, setShowFilters] = useState(false);
@@ -169,12 +171,10 @@ const JobsPage = () => {
       setLoading(true);
       try {
         const res = await axios.get(
-          `http://localhost:8000/jobs/match?email=${encodeURIComponent(email)}&sort_by=${encodeURIComponent(sortBy)}`
+          `http://localhost:8000/jobs/match?email=${encodeURIComponent(email)}&sort_by=${encodeURIComponent(sortBy)}&top_k=${MATCH_PAGE_SIZE}`
         );
-        let fetched = res.data.jobs || [];
-        if (sortBy === "date") {
-          fetched = fetched.slice().sort((a, b) => new Date(b.date_posted) - new Date(a.date_posted));
-        }
+        // ranked by the server: best match first, or newest first over every match when sortBy === "date"
+        const fetched = res.data.jobs || [];
         setJobs(fetched.map(j => ({ ...j, score: Math.min(Math.max(j.score ?? 0, 0), 1) })));
         setViewingMatched(true);
       } catch (err) { console.error(err); }
@@ -189,10 +189,11 @@ const JobsPage = () => {
     if (!query.trim()) return;
     setLoading(true); setJobs([]);
     try {
-      const res = await axios.get(`http://localhost:8000/jobs/search?query=${encodeURIComponent(query)}`);
-      let searched = (res.data.jobs || [])
-        .slice().sort((a, b) => new Date(b.date_posted) - new Date(a.date_posted))
-        .map(j => ({ ...j, score: 0 }));
+      const res = await axios.get(
+        `http://localhost:8000/jobs/search?query=${encodeURIComponent(query)}&page_size=${SEARCH_PAGE_SIZE}`
+      );
+      // already ranked by relevance (newest first among ties) by the server
+      let searched = (res.data.jobs || []).map(j => ({ ...j, score: 0 }));
       setJobs(searched);
       setViewingMatched(false);
     } catch (err) { console.error(err); }
@@ -314,7 +315,7 @@ const JobsPage = () => {
         {viewingMatched && !loading && (
           <div style={S.sortRow}>
             <span style={S.sortLabel}>SORT</span>
-            <button style={S.pill(sortBy === "best_match")} onClick={() => setSortBy("best_match")}>Best Match</button>
+            <button style={S.pill(sortBy === "score")} onClick={() => setSortBy("score")}>Best Match</button>
             <button style={S.pill(sortBy === "date")} onClick={() => setSortBy("date")}>Date Posted</button>
           </div>
         )}
@@ -3,12 +3,12 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from groq import Groq
 import json
-import language_tool_python
 from database import get_db
 from models import Profile, InterviewResult
 from auth import get_current_user
 from models import User
 from dotenv import load_dotenv
+from model_registry import registry
 import os
 
 router = APIRouter()
@@ -26,9 +26,16 @@ GROQ_MODEL = "llama-3.1-8b-instant"
 # Using LanguageTool's public remote API — no Java install needed.
 # Sends text to api.languagetool.org over HTTPS. Free tier allows
 # up to 20 requests/min which is plenty for interview use.
-print("Initialising LanguageTool (remote)…")
-_lang_tool = language_tool_python.LanguageTool("en-US")
-print("LanguageTool ready.")
+def _load_lang_tool():
+    import language_tool_python
+    return language_tool_python.LanguageTool("en-US")
+
+
+registry.register(
+    "text_interview.language_tool",
+    _load_lang_tool,
+    warmup=lambda tool: tool.check("This are a warmup sentence."),
+)
 
 
 # ── Schemas ────────────────────────────────────────────────────────────────────
@@ -97,7 +104,7 @@ def _score_grammar(text: str) -> tuple[int, str, list[str]]:
         "UNLIKELY_OPENING_PUNCTUATION",
     }
 
-    matches = _lang_tool.check(text)
+    matches = registry.get("text_interview.language_tool").check(text)
 
     # Filter out noisy rules
     matches = [m for m in matches if m.rule_id not in IGNORED_RULE_IDS]
@@ -6,6 +6,7 @@ from models import Profile, User
 from schemas import ProfileCreate, ProfileResponse
 from auth import get_current_user
 import json
+from jobs.profile_cache import invalidate_profile
 
 router = APIRouter(prefix="/profile", tags=["Profile"])
 
@@ -32,6 +33,7 @@ def create_profile(profile_data: ProfileCreate, db: Session = Depends(get_db), c
     db.add(new_profile)
     db.commit()
     db.refresh(new_profile)
+    invalidate_profile(new_profile.user_email)
 
     # Convert JSONB fields to dict/list before returning
     return {
@@ -83,6 +85,7 @@ def update_profile(profile_data: ProfileCreate, db: Session = Depends(get_db), c
 
     db.commit()
     db.refresh(profile)
+    invalidate_profile(profile.user_email)
 
     return {
         "id": profile.id,
@@ -5,6 +5,7 @@ Full pipeline: voice confidence + eye contact + posture + content scoring
 import os, json, tempfile, subprocess, numpy as np
 from groq import Groq
 from dotenv import load_dotenv
+from model_registry import registry
 
 load_dotenv()
 
@@ -25,6 +26,27 @@ FRAME_SKIP      = 5
 
 FFMPEG_PATH = r"C:\Users\HP\Videos\ffmpeg-8.1-essentials_build\ffmpeg-8.1-essentials_build\bin\ffmpeg.exe"
 
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+
+
+# Loaded once per process through the model registry, not per request
+def _load_whisper():
+    import whisper
+    return whisper.load_model(WHISPER_MODEL)
+
+
+def _load_confidence_model():
+    import joblib
+    return joblib.load(MODEL_PKL)
+
+
+def _warmup_whisper(model):
+    model.transcribe(np.zeros(16000, dtype=np.float32))  # one second of silence
+
+
+registry.register("video.whisper", _load_whisper, warmup=_warmup_whisper)
+registry.register("video.confidence", _load_confidence_model)
+
 
 def _load_mediapipe_models():
     import urllib.request
@@ -99,13 +121,12 @@ def _extract_features(audio_path: str):
 
 
 def analyze_voice_confidence(audio_path: str) -> dict:
-    import joblib
     default = {"score": 50, "label": "Medium Confidence",
                "probabilities": {"low": 0.2, "medium": 0.6, "high": 0.2}}
     if not os.path.exists(MODEL_PKL):
         return default
     try:
-        d      = joblib.load(MODEL_PKL)
+        d      = registry.get("video.confidence")
         model  = d["model"]; scaler = d["scaler"]
         vec    = _extract_features(audio_path)
         if vec is None:
@@ -130,8 +151,7 @@ FILLERS = {"um","uh","er","ah","hmm","like","you know","i mean",
            "basically","literally","sort of","kind of"}
 
 def transcribe_and_disfluency(audio_path: str) -> dict:
-    import whisper
-    model      = whisper.load_model("base")
+    model      = registry.get("video.whisper")
     res        = model.transcribe(audio_path, word_timestamps=True)
     transcript = res["text"].strip()
     tl, words  = transcript.lower(), transcript.lower().split()